@@ -0,0 +1,258 @@
+CASES = (
+    (1000, 1, 16),
+    (10000, 1, 16),
+    (100000, 1, 16),
+    (100000, 4, 16),
+    (100000, 1, 256),
+    (1000000, 1, 16),
+    (1000000, 4, 256)
+)
+
+TILE_DIMENSIONS = (16, 16)
+STROKE_LENGTH = 64
+DIAGONAL_STEP = (3, 2)
+FONT_CALLS = 1000
+
+def get_name(tiles, strata, tileset):
+    return f'tiles={tiles},strata={strata},tileset={tileset}'
+
+def generate(path, tiles, strata, tileset):
+    sheet = pygame.Surface((tileset * 5, 4))
+    for i in range(tileset):
+        sheet.fill((32 + i * 97 % 224, 32 + i * 57 % 224, 32 + i * 31 % 224), (i * 5, 0, 4, 4))
+        sheet.set_at((i * 5 + 4, 0), SPRITESHEET_STOP_COLOR)
+
+    pygame.image.save(sheet, os.path.join(path, 'tileset.png'))
+
+    cells = -(-tiles // strata)
+    side = max(math.ceil(math.sqrt(cells)), 128)
+
+    random = numpy.random.default_rng(0)
+    records = numpy.zeros(tiles, formats.TILE_DTYPE)
+
+    i = numpy.arange(tiles)
+    records['x'] = i % cells % side * TILE_DIMENSIONS[0]
+    records['y'] = i % cells // side * TILE_DIMENSIONS[1]
+    records['strata'] = i // cells
+    records['tileset'] = 0
+    records['tile'] = 1
+    records['index'] = random.integers(0, tileset, tiles)
+    records['orientation'] = random.integers(0, 4, tiles) * 90
+    records['flipped'] = random.integers(0, 2, tiles)
+    records['width'], records['height'] = TILE_DIMENSIONS
+
+    config = {
+        'name': get_name(tiles, strata, tileset),
+        'autosave': 0,
+        'images': {'tileset': {'path': 'tileset.png', 'tiles': 'tile'}},
+        'tile': {'dimensions': list(TILE_DIMENSIONS)},
+        'tilemap': {'dimensions': [side, side]}
+    }
+
+    formats.write(path, formats.JSON_FILE, {'config': config}, ['tileset', 'tile'], records)
+
+def measure(func, repeat, setup=None):
+    samples = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+
+    return {'min': min(samples), 'median': statistics.median(samples), 'max': max(samples)}
+
+def check_interpolate():
+    for dx in range(-8, 9):
+        for dy in range(-8, 9):
+            end = (dx * TILE_DIMENSIONS[0], dy * TILE_DIMENSIONS[1])
+            positions = tools.interpolate((0, 0), end, TILE_DIMENSIONS)
+
+            steps = [(abs(b[0] - a[0]) // TILE_DIMENSIONS[0], abs(b[1] - a[1]) // TILE_DIMENSIONS[1]) for a, b in zip(positions, positions[1:])]
+
+            assert positions[-1] == end, f'[bench::check_interpolate] {end} ends at {positions[-1]}'
+            assert all(max(step) == 1 for step in steps), f'[bench::check_interpolate] {end} skips or repeats a cell: {positions}'
+            assert len(steps) == max(abs(dx), abs(dy)), f'[bench::check_interpolate] {end} takes {len(steps)} steps'
+
+def frame():
+    tmedit.update()
+    tmedit.render()
+
+def stroke(name, strata, step=(1, 0), snapping=True):
+    tool = tmedit.tools[name]
+    tmedit.tool = (name, tool)
+    tmedit.settings['strata'] = strata
+    tmedit.modes['snapping'] = snapping
+    tmedit.mouse_focus = True
+
+    offset = 0 if snapping else TILE_DIMENSIONS[0] // 3
+
+    for i in range(STROKE_LENGTH // max(step)):
+        tmedit.mouse_position.xy = (i * step[0] * TILE_DIMENSIONS[0] + offset, i * step[1] * TILE_DIMENSIONS[1] + offset)
+        tool.on_mouse_down(pygame.Event(pygame.MOUSEBUTTONDOWN, button=1))
+
+    tmedit.on_mouse_up(pygame.Event(pygame.MOUSEBUTTONUP, button=1))
+    tmedit.modes['snapping'] = True
+
+def run_case(path, tiles, strata, tileset, repeat, frames):
+    generate(path, tiles, strata, tileset)
+
+    results = {}
+    results['load'] = measure(lambda: tmedit.load(path), repeat)
+
+    for _ in range(frames):
+        frame()
+
+    results['frame'] = measure(frame, frames)
+
+    results['brush'] = measure(lambda: stroke('brush', strata), repeat, tmedit.undo)
+    tmedit.undo()
+
+    results['brush_diagonal'] = measure(lambda: stroke('brush', strata, DIAGONAL_STEP), repeat, tmedit.undo)
+    tmedit.undo()
+
+    results['brush_unsnapped'] = measure(lambda: stroke('brush', strata, DIAGONAL_STEP, False), repeat, tmedit.undo)
+    tmedit.undo()
+
+    results['undo'] = measure(tmedit.undo, repeat, lambda: stroke('brush', strata))
+
+    results['erase'] = measure(lambda: stroke('erase', 0), repeat, tmedit.undo)
+    tmedit.undo()
+
+    results['save'] = measure(tmedit.save, repeat, lambda: (tmedit.undo(), stroke('brush', strata)))
+    results['compact'] = measure(lambda: (tmedit.compact(), tmedit.wait()), repeat, lambda: (tmedit.undo(), stroke('brush', strata)))
+    tmedit.undo()
+
+    tmedit.tool = ('move', tmedit.tools['move'])
+    return results
+
+def run_font(repeat):
+    counter = iter(range(repeat * FONT_CALLS))
+
+    def create_uncached():
+        for _ in range(FONT_CALLS):
+            core.font_service.create('m3x6', f'strata: {next(counter)}')
+
+    def create_cached():
+        for _ in range(FONT_CALLS):
+            core.font_service.create('m3x6', 'strata: 0')
+
+    return {
+        'create': measure(create_uncached, repeat),
+        'create_cached': measure(create_cached, repeat)
+    }
+
+def compare(results, baseline, tolerance, floor):
+    regressions = []
+    for case, metrics in results.items():
+        for metric, current in metrics.items():
+            previous = baseline.get(case, {}).get(metric)
+            if not previous:
+                continue
+
+            if current['median'] > previous['median'] * (1 + tolerance) and current['median'] - previous['median'] > floor:
+                regressions.append((case, metric, previous['median'], current['median']))
+
+    return regressions
+
+def main(args):
+    check_interpolate()
+
+    results = {}
+
+    with tempfile.TemporaryDirectory(prefix='tmedit-bench-') as root:
+        for tiles, strata, tileset in CASES:
+            if tiles > args.max_tiles:
+                continue
+
+            name = get_name(tiles, strata, tileset)
+            print(f'[bench] {name}', file=sys.stderr)
+
+            path = os.path.join(root, name.replace(',', '_').replace('=', '-'))
+            os.mkdir(path)
+
+            results[name] = run_case(path, tiles, strata, tileset, args.repeat, args.frames)
+
+        if tmedit.tilemap:
+            tmedit.tilemap.journal.close()
+            tmedit.tilemap = None
+
+    results['font'] = run_font(args.repeat)
+
+    for case, metrics in results.items():
+        for metric, stats in metrics.items():
+            print(f'{case:<36} {metric:<14} {stats["median"]:>10.3f} ms', file=sys.stderr)
+
+    output = {
+        'meta': {
+            'python': platform.python_version(),
+            'pygame': pygame.version.ver,
+            'numpy': numpy.__version__,
+            'platform': platform.platform(),
+            'repeat': args.repeat,
+            'frames': args.frames
+        },
+        'results': results
+    }
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(output, f, indent=2)
+    else:
+        print(json.dumps(output, indent=2))
+
+    if not args.baseline:
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)['results']
+
+    regressions = compare(results, baseline, args.tolerance, args.floor)
+    for case, metric, previous, current in regressions:
+        print(f'[bench] regression: {case} {metric} {previous:.3f} ms -> {current:.3f} ms', file=sys.stderr)
+
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    import os
+
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+    from pge.core import Core
+    from pge.utils.spritesheet_loader import SPRITESHEET_STOP_COLOR
+
+    from scripts import TITLE, SCREEN_DIMENSIONS, FRAME_RATE
+    from scripts import Tmedit
+    from scripts import formats
+    from scripts import tools
+
+    import statistics
+    import argparse
+    import platform
+    import tempfile
+    import pygame
+    import numpy
+    import math
+    import json
+    import time
+    import sys
+
+    parser = argparse.ArgumentParser(description='Headless benchmarks on synthetic tilemaps.')
+    parser.add_argument('--output', help='write results to this JSON file instead of stdout')
+    parser.add_argument('--baseline', help='JSON results to compare against, exits with 1 on regressions')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed relative slowdown of a median (default 0.25)')
+    parser.add_argument('--floor', type=float, default=0.5, help='ignore slowdowns under this many ms (default 0.5)')
+    parser.add_argument('--max-tiles', type=int, default=1000000, help='skip cases with more tiles than this')
+    parser.add_argument('--repeat', type=int, default=5, help='samples per measurement (default 5)')
+    parser.add_argument('--frames', type=int, default=60, help='frames sampled for the render measurement (default 60)')
+
+    args = parser.parse_args()
+
+    core = Core(TITLE, SCREEN_DIMENSIONS, FRAME_RATE, mouse=False)
+    core.events = []
+
+    tmedit = Tmedit()
+
+    sys.exit(main(args))
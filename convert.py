@@ -0,0 +1,21 @@
+def main(path, file):
+    source = formats.detect(path)
+
+    data, names, records, _ = formats.read(path, source)
+    formats.write(path, file, data, names, records)
+    del records
+
+    if source != file:
+        os.replace(os.path.join(path, source), os.path.join(path, f'{source}.bak'))
+
+if __name__ == '__main__':
+    from scripts import formats
+
+    import sys
+    import os
+
+    if len(sys.argv) != 3 or sys.argv[2] not in ('json', 'binary'):
+        print('usage: convert.py <tilemap directory> <json|binary>')
+        sys.exit(1)
+
+    main(sys.argv[1], formats.BINARY_FILE if sys.argv[2] == 'binary' else formats.JSON_FILE)
@@ -2,4 +2,6 @@ from pge.core.sprite import Sprite
 from pge.core.input import Input
 from pge.core.sound import Sound
 from pge.core.font import Font
+from pge.core.timings import Timings
+from pge.core.trace import Trace
 from pge.core.core import Core
@@ -3,8 +3,11 @@ from pge.types import Singleton
 from pge.core import Input
 from pge.core import Font
 from pge.core import Sound
+from pge.core import Timings
+from pge.core import Trace
 
 from pge.network import Client
+from pge.utils import Easings
 
 import pygame
 import typing
@@ -16,16 +19,20 @@ class Core:
     The entrypoint for pge.
     '''
 
+    _WAIT_TIMEOUT: typing.Final[int] = 1000
+
     def __init__(self, title: str, screen_dimensions: tuple[int, int], frame_rate: int,
                  flags: typing.Optional[int] = 0, icon: typing.Optional[str] = None,
-                 mouse: typing.Optional[bool] = True, opengl: typing.Optional[bool] = False) -> None:
+                 mouse: typing.Optional[bool] = True, opengl: typing.Optional[bool] = False,
+                 dirty_rects: typing.Optional[bool] = False, wait_events: typing.Optional[bool] = False) -> None:
         '''
         Initializes the pygame library given a `title`, `screen_dimensions`, 
         `frame_rate`.
 
         Optionally, provide any display `flags`, an `icon` image, if the 
-        `mouse` will be visible, or if the screen will be using an `opengl`
-        context.
+        `mouse` will be visible, if the screen will be using an `opengl`
+        context, if only `dirty_rects` will be presented, or if the loop
+        will `wait_events` while idle.
         '''
 
         pygame.init()
@@ -46,6 +53,12 @@ class Core:
         self.opengl: bool = opengl
         self.quit: bool = False
 
+        self.dirty_rects: bool = dirty_rects
+        self.wait_events: bool = wait_events
+
+        self._dirty: typing.Union[None, list[pygame.Rect]] = None
+        self._wake_time: typing.Union[None, float] = None
+
         self.screen: pygame.Surface = pygame.display.set_mode(screen_dimensions, flags)
         self.screen_color: tuple[int, int, int] = (0, 0, 0)
 
@@ -60,6 +73,9 @@ class Core:
         self.input_service: Input = Input()
         self.font_service: Font = Font()
         self.sound_service: Sound = Sound()
+        self.trace_service: Trace = Trace()
+
+        self.timings: Timings = Timings()
         
     def __del__(self) -> None:
         '''
@@ -69,28 +85,127 @@ class Core:
         pygame.mixer.quit()
         pygame.quit()
 
+    def mark_dirty(self, rect: typing.Optional[pygame.Rect] = None) -> None:
+        '''
+        Marks a `rect` of the screen to be presented this frame.
+
+        If no `rect` is given, the whole screen is presented.
+        '''
+
+        if rect is None:
+            self._dirty = None
+        elif self._dirty is not None:
+            self._dirty.append(pygame.Rect(rect))
+
+    def wake(self, delay: typing.Optional[float] = 0) -> None:
+        '''
+        Requests a frame to be run within `delay` seconds, even if the
+        application would otherwise be idle.
+        '''
+
+        wake_time: float = time.time() + delay
+        if self._wake_time is None or wake_time < self._wake_time:
+            self._wake_time = wake_time
+
+    @property
+    def idle(self) -> bool:
+        '''
+        Returns whether the current frame can be skipped, meaning there
+        are no events, easings, held mouse buttons, dirty rects or wake 
+        requests.
+        '''
+
+        if self.events or self._dirty != []:
+            return False
+        
+        if Easings.instanced and Easings().active:
+            return False
+        
+        if any(pygame.mouse.get_pressed()):
+            return False
+        
+        return self._wake_time is None or time.time() < self._wake_time
+
+    def _wait(self) -> list[pygame.Event]:
+        '''
+        Blocks until an event arrives, a wake request is due, or the
+        wait times out.
+        '''
+
+        timeout: int = self._WAIT_TIMEOUT
+        if self._wake_time is not None:
+            timeout = min(timeout, max(int((self._wake_time - time.time()) * 1000), 1))
+
+        event: pygame.Event = pygame.event.wait(timeout)
+        if event.type == pygame.NOEVENT:
+            return []
+        
+        return [event] + pygame.event.get()
+
+    def _present(self) -> None:
+        '''
+        Presents the frame, either fully or only the dirty rects.
+        '''
+
+        if not self.dirty_rects or self._dirty is None:
+            pygame.display.flip()
+        elif self._dirty:
+            pygame.display.update(self._dirty)
+
+        self._dirty = []
+
     def run(self, func: typing.Optional[typing.Callable] = None, *args: typing.Sequence[any]) -> None:
         '''
         Run the main loop.
 
         Polls pygame events, calculates delta time, and maintains frame rate.
+        Each phase of the loop is recorded in `timings`.
 
         In addition, can run a given `func` and it's `args` each loop.
+
+        If `dirty_rects` is enabled, idle frames are skipped and only the
+        rects given to `mark_dirty` are presented. If `wait_events` is
+        enabled, idle frames block on the event queue instead of polling.
         '''
 
         while not self.quit:
-            self.events = pygame.event.get()
-            self.quit = self.input_service._run(self.events)
+            with self.timings.time('events'):
+                self.events = pygame.event.get()
+
+            if self.wait_events and self.idle:
+                self.events = self._wait()
+                self.last_time = time.time() - 1 / self.frame_rate
+
+            with self.timings.time('input'):
+                self.quit = self.input_service._run(self.events)
             
             self.delta_time = (time.time() - self.last_time) * self.frame_rate
             self.last_time = time.time()
 
             self.frame_count += 1 * self.delta_time
+
+            if self.dirty_rects or self.wait_events:
+                if [e for e in self.events if e.type in (pygame.WINDOWEXPOSED, pygame.WINDOWRESTORED, pygame.VIDEOEXPOSE)]:
+                    self.mark_dirty()
+
+                if self.idle:
+                    self.timings.discard()
+                    self.clock.tick(self.frame_rate)
+                    continue
+
+                if self._wake_time is not None and time.time() >= self._wake_time:
+                    self._wake_time = None
             
-            if func:
-                func(*args)
+            with self.trace_service.span('frame'):
+                if func:
+                    with self.timings.time('frame'):
+                        func(*args)
 
-            pygame.display.flip()
+                with self.timings.time('present'):
+                    self._present()
+
+            self.timings.commit()
+            self.trace_service._frame()
             self.clock.tick(self.frame_rate)
 
         if Client.instanced:
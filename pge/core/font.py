@@ -1,6 +1,7 @@
 from pge.types import Singleton
 from pge.utils import load_spritesheet
 
+import collections
 import pygame
 import typing
 import os
@@ -12,6 +13,7 @@ class Font:
     '''
 
     _FONT_PATH: typing.Final[str] = os.path.join('pge', '_data', 'fonts')
+    _CACHE_SIZE: typing.Final[int] = 256
     _FONT_KEYS: typing.Final[tuple[str]] = tuple(map(str, 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ1234567890!?,.;:\'\"/|\_()[]{}<>@#$%+-*=^&')) 
 
     def __init__(self) -> None:
@@ -29,40 +31,66 @@ class Font:
             for index, key in enumerate(self._FONT_KEYS):
                 self._fonts[name]['letters'][key] = images[index]
 
+        self._glyphs: dict[tuple, dict[str, pygame.Surface]] = {}
+        self._cache: collections.OrderedDict[tuple, pygame.Surface] = collections.OrderedDict()
+
+    def _get_glyphs(self, font: str, size: int, color: tuple[int, int, int]) -> dict[str, pygame.Surface]:
+        '''
+        Returns the glyph atlas for the given `font`, `size` and `color`,
+        creating it on first use.
+        '''
+
+        key: tuple = (font, size, tuple(color))
+        if key in self._glyphs:
+            return self._glyphs[key]
+        
+        glyphs: dict[str, pygame.Surface] = {}
+        for letter, image in self._fonts[font]['letters'].items():
+            image = pygame.transform.scale(image, (image.get_width() * size, image.get_height() * size)).convert_alpha()
+            glyphs[letter] = pygame.mask.from_surface(image).to_surface(setcolor=color, unsetcolor=(0, 0, 0)).convert_alpha()
+
+        space: pygame.Surface = pygame.Surface((self._fonts[font]['spacing'] * 2 * size, glyphs['a'].get_height())).convert_alpha()
+        space.fill((0, 0, 0))
+
+        glyphs[' '] = space
+
+        self._glyphs[key] = glyphs
+        return glyphs
+
     def create(self, font: str, text: str, size: typing.Optional[int] = 1, 
                color: typing.Optional[tuple[int, int, int]] = (255, 255, 255)) -> pygame.Surface:
         '''
-        Returns a new font image based on the given `font` and `text`.
+        Returns a font image based on the given `font` and `text`.
         Can optionally specify a `size` and a `color`.
+
+        Images are cached and shared between calls, and should be
+        copied before being modified.
         '''
 
-        surface_size: list[int] = [0, 0]
-        images: list[pygame.Surface] = []
+        key: tuple = (font, str(text), size, tuple(color))
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
 
-        for letter in str(text):
-            image: pygame.Surface = None
+        glyphs: dict[str, pygame.Surface] = self._get_glyphs(font, size, color)
+        spacing: int = self._fonts[font]['spacing'] * size
 
-            if letter == ' ':
-                image = pygame.Surface((self._fonts[font]['spacing'] * 2, self._fonts[font]['letters']['a'].get_height())).convert_alpha()
-                image.set_colorkey((0, 0, 0))
-            else:
-                image = self._fonts[font]['letters'][letter].copy()
+        images: list[pygame.Surface] = [glyphs[letter] for letter in str(text)]
 
-            surface_size[0] += (image.get_width() + self._fonts[font]['spacing'])
-            if image.get_height() > surface_size[1]:
-                surface_size[1] += image.get_height()
+        surface: pygame.Surface = pygame.Surface((sum(i.get_width() + spacing for i in images), max((i.get_height() for i in images), default=0))).convert_alpha()
+        surface.set_colorkey((0, 0, 0))
 
-            image = pygame.transform.scale(image, (image.get_width() * size, image.get_height() * size)).convert_alpha()
-            image = pygame.mask.from_surface(image).to_surface(setcolor=color, unsetcolor=(0, 0, 0)).convert_alpha()
+        blits: list[tuple[pygame.Surface, tuple[int, int]]] = []
 
-            images.append(image)
+        x: int = 0
+        for image in images:
+            blits.append((image, (x, 0)))
+            x += image.get_width() + spacing
 
-        surface: pygame.Surface = pygame.Surface((surface_size[0] * size, surface_size[1] * size)).convert_alpha()
-        surface.set_colorkey((0, 0, 0))
+        surface.blits(blits, False)
 
-        x: int = 0
-        for image, letter in zip(images, str(text)):
-            surface.blit(image, (x, 0))
-            x += image.get_width() + (self._fonts[font]['spacing'] * size)
+        self._cache[key] = surface
+        if len(self._cache) > self._CACHE_SIZE:
+            self._cache.popitem(last=False)
 
         return surface
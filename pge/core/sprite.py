@@ -12,13 +12,14 @@ class Sprite(pygame.sprite.Sprite):
 
     def __init__(self, image: typing.Union[pygame.Surface, str], index: typing.Optional[int] = 0, 
                  position: typing.Optional[pygame.Vector2] = pygame.Vector2(0, 0),
-                 image_scale: typing.Optional[float] = 1) -> None:
+                 image_scale: typing.Optional[float] = 1, copy_image: typing.Optional[bool] = True) -> None:
         '''
         Creates the sprite object with the given `image` path or
         surface.
         
         Optionally, a rendering `index`, starting `position` or
-        `image_scale`.
+        `image_scale`. If `copy_image` is false, `original_image` 
+        shares the given surface instead of copying it.
         '''
 
         pygame.sprite.Sprite.__init__(self)
@@ -32,20 +33,69 @@ class Sprite(pygame.sprite.Sprite):
 
         self.image.set_colorkey((0, 0, 0))
 
-        self.original_image: typing.Final[pygame.Surface] = self.image.copy()
+        self.original_image: typing.Final[pygame.Surface] = self.image.copy() if copy_image else self.image
 
         self.index: int = index
 
         self.rect: pygame.FRect = self.image.get_frect(topleft=position)
         self.original_rect: typing.Final[pygame.FRect] = self.image.get_frect(topleft=position)
 
+    @property
+    def image(self) -> pygame.Surface:
+        '''
+        Returns the sprite's `image`.
+        '''
+
+        return self._image
+    
+    @image.setter
+    def image(self, image: pygame.Surface) -> None:
+        '''
+        Sets the sprite's `image` and invalidates the cached mask.
+        '''
+
+        self._image = image
+        self._mask = None
+    
+    @property
+    def rect(self) -> pygame.FRect:
+        '''
+        Returns the sprite's `rect`.
+        '''
+
+        return self._rect
+    
+    @rect.setter
+    def rect(self, rect: pygame.FRect) -> None:
+        '''
+        Sets the sprite's `rect` and invalidates the cached geometry.
+        '''
+
+        self._rect = rect
+        self._geometry = {}
+
+    def invalidate(self) -> None:
+        '''
+        Clears the cached mask and geometry.
+
+        Should be called after modifying `image` or `rect` in place.
+        '''
+
+        self._mask = None
+        self._geometry = {}
+
     @property
     def mask(self) -> pygame.Mask:
         '''
         Returns a `Mask` object created from the sprite's `image`.
+
+        The mask is cached until `image` is reassigned.
         '''
 
-        return pygame.mask.from_surface(self.image)
+        if self._mask is None:
+            self._mask = pygame.mask.from_surface(self.image)
+
+        return self._mask
     
     @property
     def position(self) -> pygame.Vector2:
@@ -60,17 +110,29 @@ class Sprite(pygame.sprite.Sprite):
         '''
         Returns a `pygame.Vector2` object created from the sprite's 
         `rect` size.
+
+        The vector is cached until `rect` is reassigned, and should
+        not be modified.
         '''
 
-        return pygame.Vector2(self.rect.size)
+        if 'size' not in self._geometry:
+            self._geometry['size'] = pygame.Vector2(self.rect.size)
+
+        return self._geometry['size']
     
     def get_position(self, point: str = 'topleft') -> pygame.Vector2:
         '''
         Returns a `pygame.Vector2` object created from a given `point`
         on the sprite's rect.
+
+        The vector is cached until `rect` is reassigned, and should
+        not be modified.
         '''
             
-        return pygame.Vector2(getattr(self.rect, point))
+        if point not in self._geometry:
+            self._geometry[point] = pygame.Vector2(getattr(self.rect, point))
+
+        return self._geometry[point]
 
     def update(self) -> None:
         '''
@@ -0,0 +1,106 @@
+import collections
+import contextlib
+import typing
+import time
+
+class Timings:
+    '''
+    Class for collecting named frame timings.
+
+    Timings added during a frame are summed per name, and stored in a
+    fixed-size ring buffer when the frame is committed.
+    '''
+
+    _PERCENTILES: typing.Final[tuple[int]] = (50, 95, 99)
+
+    def __init__(self, size: typing.Optional[int] = 600) -> None:
+        '''
+        Creates the timings object, keeping the last `size` frames
+        of each timer.
+        '''
+
+        self.size: int = size
+
+        self._samples: dict[str, collections.deque[float]] = {}
+        self._frame: dict[str, float] = {}
+
+    @property
+    def names(self) -> tuple[str]:
+        '''
+        Returns the names of all recorded timers.
+        '''
+
+        return tuple(self._samples.keys())
+
+    @contextlib.contextmanager
+    def time(self, name: str) -> typing.Iterator[None]:
+        '''
+        Context manager that adds the time spent inside it to the
+        timer `name`.
+        '''
+
+        start: float = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name: str, seconds: float) -> None:
+        '''
+        Adds `seconds` to the timer `name` for the current frame.
+        '''
+
+        self._frame[name] = self._frame.get(name, 0) + seconds
+
+    def commit(self) -> None:
+        '''
+        Stores the current frame's timers in their ring buffers.
+        '''
+
+        for name, seconds in self._frame.items():
+            if name not in self._samples:
+                self._samples[name] = collections.deque(maxlen=self.size)
+
+            self._samples[name].append(seconds)
+
+        self._frame.clear()
+
+    def discard(self) -> None:
+        '''
+        Discards the current frame's timers without storing them.
+        '''
+
+        self._frame.clear()
+
+    def clear(self) -> None:
+        '''
+        Clears all recorded timers.
+        '''
+
+        self._samples.clear()
+        self._frame.clear()
+
+    def stats(self, name: str) -> dict[int, float]:
+        '''
+        Returns the p50, p95 and p99 of the timer `name` in
+        milliseconds.
+        '''
+
+        samples: list[float] = sorted(self._samples.get(name, ()))
+        if not samples:
+            return {p: 0.0 for p in self._PERCENTILES}
+
+        return {p: samples[min(len(samples) * p // 100, len(samples) - 1)] * 1000 for p in self._PERCENTILES}
+
+    def report(self) -> tuple[str]:
+        '''
+        Returns a line of stats for every timer.
+        '''
+
+        lines: list[str] = []
+        for name in self._samples:
+            stats: dict[int, float] = self.stats(name)
+            lines.append(f'{name}: ' + ' '.join(f'p{p} {v:.2f}' for p, v in stats.items()))
+
+        return tuple(lines)
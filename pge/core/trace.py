@@ -0,0 +1,160 @@
+from pge.types import Singleton
+
+import collections
+import contextlib
+import functools
+import threading
+import cProfile
+import typing
+import json
+import time
+import os
+
+@Singleton
+class Trace:
+    '''
+    Singleton class for recording nested spans as Chrome trace events,
+    and for capturing frames under `cProfile`.
+
+    Spans cost a single attribute check while tracing is disabled.
+    '''
+
+    _NULL_SPAN: typing.Final[contextlib.nullcontext] = contextlib.nullcontext()
+    _EVENT_LIMIT: typing.Final[int] = 100000
+
+    def __init__(self) -> None:
+        self.enabled: bool = False
+
+        self._events: collections.deque[dict] = collections.deque(maxlen=self._EVENT_LIMIT)
+        self._pid: int = os.getpid()
+
+        self._trace_frames: int = 0
+        self._trace_path: typing.Union[None, str] = None
+
+        self._profile: typing.Union[None, cProfile.Profile] = None
+        self._profile_frames: int = 0
+        self._profile_path: typing.Union[None, str] = None
+
+    def span(self, name: str, **args: dict[str, any]) -> typing.ContextManager:
+        '''
+        Returns a context manager that records a span `name` with the
+        given `args` while tracing is enabled.
+        '''
+
+        if not self.enabled:
+            return self._NULL_SPAN
+
+        return self._span(name, args)
+
+    def traced(self, name: typing.Optional[str] = None) -> typing.Callable:
+        '''
+        Decorator that records a span for every call of the decorated
+        function, named `name` or the function's qualified name.
+        '''
+
+        def decorator(func: typing.Callable) -> typing.Callable:
+            span_name: str = name or func.__qualname__
+
+            @functools.wraps(func)
+            def wrapper(*args: typing.Sequence[any], **kwargs: dict[str, any]) -> any:
+                if not self.enabled:
+                    return func(*args, **kwargs)
+
+                with self._span(span_name, {}):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    @contextlib.contextmanager
+    def _span(self, name: str, args: dict[str, any]) -> typing.Iterator[None]:
+        '''
+        Records the time spent inside the context as a complete event.
+        '''
+
+        start: int = time.perf_counter_ns()
+
+        try:
+            yield
+        finally:
+            self._events.append({
+                'name': name,
+                'ph': 'X',
+                'ts': start / 1000,
+                'dur': (time.perf_counter_ns() - start) / 1000,
+                'pid': self._pid,
+                'tid': threading.get_ident(),
+                'args': args
+            })
+
+    def start(self) -> None:
+        '''
+        Clears any recorded spans and starts tracing.
+        '''
+
+        self._events.clear()
+        self.enabled = True
+
+    def stop(self) -> None:
+        '''
+        Stops tracing, keeping the recorded spans.
+        '''
+
+        self.enabled = False
+
+    def export(self, path: str) -> None:
+        '''
+        Writes the recorded spans to `path` as trace-event JSON, which
+        can be opened in Perfetto or `chrome://tracing`.
+        '''
+
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': list(self._events), 'displayTimeUnit': 'ms'}, f)
+
+    def capture(self, frames: int, path: str) -> None:
+        '''
+        Traces the next `frames` frames and exports them to `path`.
+        '''
+
+        self.start()
+
+        self._trace_frames = frames
+        self._trace_path = path
+
+    def profile(self, frames: int, path: str) -> None:
+        '''
+        Profiles the next `frames` frames with `cProfile` and writes the
+        stats to `path`.
+        '''
+
+        if self._profile:
+            return
+
+        self._profile = cProfile.Profile()
+        self._profile_frames = frames
+        self._profile_path = path
+
+        self._profile.enable()
+
+    def _frame(self) -> None:
+        '''
+        Ran every frame, finishes any captures that have run for their
+        number of frames.
+        '''
+
+        if self._trace_frames:
+            self._trace_frames -= 1
+
+            if not self._trace_frames:
+                self.stop()
+                self.export(self._trace_path)
+
+        if self._profile:
+            self._profile_frames -= 1
+
+            if not self._profile_frames:
+                self._profile.disable()
+                self._profile.dump_stats(self._profile_path)
+
+                self._profile = None
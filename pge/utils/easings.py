@@ -29,6 +29,14 @@ class Easings:
     def __init__(self) -> None:
         self._tasks: list[self.EasingData] = []
 
+    @property
+    def active(self) -> bool:
+        '''
+        Returns whether any easing tasks are running.
+        '''
+
+        return bool(self._tasks)
+
     def create(self, data: EasingData) -> None:
         '''
         Create a easing task using EasingData `data`
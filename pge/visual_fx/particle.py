@@ -81,6 +81,8 @@ class Particle(Sprite):
         particle's `duration` has expired.
         '''
 
+        self.core.wake()
+
         self.time += 1 * self.core.delta_time
         self.current_gravity += self.info.gravity * self.core.delta_time 
         self.current_rotation += self.info.rotation * self.core.delta_time
@@ -112,6 +114,7 @@ class Particle(Sprite):
                 )
 
         self.rect.topleft = self.current_position
+        self.invalidate()
 
     def render(self, surface=None) -> None:
         '''
@@ -1,6 +1,9 @@
 def main():
-    tmedit.update()
-    tmedit.render()
+    with core.timings.time('update'):
+        tmedit.update()
+
+    with core.timings.time('render'):
+        tmedit.render()
 
 if __name__ == '__main__':
     from pge.core import Core
@@ -12,8 +15,11 @@ if __name__ == '__main__':
 
     tkinter.Tk().withdraw()
 
-    core = Core(TITLE, SCREEN_DIMENSIONS, FRAME_RATE, mouse=False)
+    core = Core(TITLE, SCREEN_DIMENSIONS, FRAME_RATE, mouse=False, dirty_rects=True, wait_events=True)
     tmedit = Tmedit()
 
     core.run(main)
+
     tmedit.save()
+    tmedit.compact()
+    tmedit.wait()
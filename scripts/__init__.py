@@ -4,11 +4,33 @@ FRAME_RATE = 60
 SCREEN_DIMENSIONS = (1400, 800)
 SCREEN_COLOR = (0, 0, 0)
 
+CHUNK_SIZE = 15
+CHUNK_SURFACES = 2
+CHUNK_PREFETCH = 1
+
+TILE_BUDGET = 500000
+
+AUTOSAVE_INTERVAL = 120
+JOURNAL_LIMIT = 4 * 1024 * 1024
+
+HISTORY_LIMIT = 100
+HISTORY_BUDGET = 500000
+
+IMAGE_CACHE_SIZE = 1024
+
+TRACE_FRAMES = 120
+PROFILE_FRAMES = 120
+
 import os
 IMAGE_PATH = os.path.join('resources', 'images')
 del os
 
-from scripts.components import Button, Alert, Tile
+from scripts.components import Button, Alert
+from scripts.hud import Label, Hud
+from scripts.tilestore import TileStore
+from scripts.journal import Journal
+from scripts.history import History
+from scripts.tilemap import Chunk, Tilemap
 from scripts.navbar import Navbar
 from scripts.sidebar import Sidebar
 from scripts.tools import TOOLS
@@ -11,7 +11,7 @@ class Button(Sprite):
         self.easings = Easings()
         self.bezier = Bezier()
 
-        super().__init__(image, position=position)
+        super().__init__(image, position=position, copy_image=False)
 
         self.on_click_func = None
         self.hovering = False
@@ -43,8 +43,11 @@ class Button(Sprite):
             if [e for e in self.core.events if e.type == pygame.MOUSEBUTTONDOWN]:
                 self.on_click_func[0](*self.on_click_func[1])
     
-    def render(self):
-        self.core.screen.blit(self.image, self.rect)
+    def render(self, surface=None, offset=(0, 0)):
+        if not surface:
+            surface = self.core.screen
+
+        surface.blit(self.image, self.rect.move(offset))
 
 class Alert(Sprite):
     def __init__(self, position, message, duration):
@@ -58,8 +61,8 @@ class Alert(Sprite):
 
         self.alpha = 255
 
-        image = self.core.font_service.create('m3x6', message)
-        super().__init__(image, position=position)
+        image = self.core.font_service.create('m3x6', message).copy()
+        super().__init__(image, position=position, copy_image=False)
 
         data = self.easings.EasingData(self, 'alpha', (255, 0), [0, self.duration], self.bezier.BezierPresets.EASE_IN)
         self.easings.create(data)
@@ -70,30 +73,3 @@ class Alert(Sprite):
         
     def render(self):
         self.core.screen.blit(self.image, self.image.get_rect(midtop=self.position))
-
-class Tile(Sprite):
-    def __init__(self, image, dimensions, flipped, index, orientation, position, strata, tile, tileset):
-        super().__init__(image, strata, position)
-        self._dimensions = dimensions
-
-        self.flipped = flipped
-        self.orientation = orientation
-        self.strata = strata
-
-        self.tile = tile
-        self.tileset = tileset
-        self.image_index = index
-
-    def render(self, surface, strata=None):
-        if strata != None:
-            if strata == self.strata and self.image.get_alpha() != 255:
-                self.image.set_alpha(255)
-            
-            if strata != self.strata and self.image.get_alpha() != 55:
-                self.image.set_alpha(55)
-
-        else:
-            if self.image.get_alpha() != 255:
-                self.image.set_alpha(255)
-
-        surface.blit(self.image, self.rect)
@@ -0,0 +1,240 @@
+from pge.core import Trace
+
+from scripts import CHUNK_SIZE
+
+import tempfile
+import shutil
+import numpy
+import struct
+import json
+import mmap
+import time
+import os
+
+JSON_FILE = 'tilemap.json'
+BINARY_FILE = 'tilemap.tmb'
+JOURNAL_FILE = 'tilemap.journal'
+
+MAGIC = b'TMAP'
+VERSION = 3
+
+JSON_SLICE = 4096
+
+HEADER = struct.Struct('<4sHHI')
+CHUNK_HEADER = struct.Struct('<III')
+
+CHUNK_DTYPE = numpy.dtype([
+    ('x', '<i4'),
+    ('y', '<i4'),
+    ('offset', '<u4'),
+    ('count', '<u4')
+])
+
+TILE_DTYPE = numpy.dtype([
+    ('x', '<i4'),
+    ('y', '<i4'),
+    ('tileset', '<i4'),
+    ('index', '<i4'),
+    ('tile', '<i4'),
+    ('orientation', '<i2'),
+    ('strata', 'i1'),
+    ('flipped', '?'),
+    ('width', '<i2'),
+    ('height', '<i2')
+])
+
+def detect(path):
+    for file in (BINARY_FILE, JSON_FILE):
+        if os.path.exists(os.path.join(path, file)):
+            return file
+
+    raise FileNotFoundError(os.path.join(path, JSON_FILE))
+
+@Trace().traced('formats.read')
+def read(path, file=None):
+    file = file or detect(path)
+
+    if file == BINARY_FILE:
+        with open(os.path.join(path, file), 'rb') as f:
+            return read_binary(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    with open(os.path.join(path, file)) as f:
+        return read_json(json.load(f))
+
+@Trace().traced('formats.write')
+def write(path, file, data, names, records):
+    if file == BINARY_FILE:
+        buffer = write_binary(data, names, records)
+    else:
+        buffer = encode_json(data, names, records)
+
+    target = os.path.join(path, file)
+    descriptor, temp = tempfile.mkstemp(prefix=f'.{file}.', dir=path)
+
+    try:
+        with os.fdopen(descriptor, 'wb') as f:
+            if os.path.exists(target):
+                shutil.copymode(target, temp)
+            else:
+                os.chmod(temp, 0o644)
+
+            f.write(buffer)
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(temp, target)
+        sync_directory(path)
+
+    except BaseException:
+        if os.path.exists(temp):
+            os.remove(temp)
+
+        raise
+
+    return buffer
+
+def sync_directory(path):
+    if not hasattr(os, 'O_DIRECTORY'):
+        return
+
+    descriptor = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+def read_json(data):
+    tiles = data['tiles']
+    records = numpy.zeros(len(tiles), TILE_DTYPE)
+
+    names = []
+    ids = {}
+
+    def intern(name):
+        if name not in ids:
+            ids[name] = len(names)
+            names.append(name)
+
+        return ids[name]
+
+    records['x'] = [round(t['position'][0]) for t in tiles]
+    records['y'] = [round(t['position'][1]) for t in tiles]
+    records['tileset'] = [intern(t['tileset']) for t in tiles]
+    records['index'] = [t['index'] for t in tiles]
+    records['tile'] = [intern(t['tile']) for t in tiles]
+    records['orientation'] = [t['orientation'] for t in tiles]
+    records['strata'] = [t['strata'] for t in tiles]
+    records['flipped'] = [t['flipped'] for t in tiles]
+    records['width'] = [t['dimensions'][0] for t in tiles]
+    records['height'] = [t['dimensions'][1] for t in tiles]
+
+    return {k: v for k, v in data.items() if k != 'tiles'}, names, records, None
+
+def write_json(data, names, records):
+    columns = {name: records[name].tolist() for name in TILE_DTYPE.names}
+
+    tiles = []
+    for i in range(len(records)):
+        tiles.append({
+            'dimensions': [columns['width'][i], columns['height'][i]],
+            'flipped': columns['flipped'][i],
+            'index': columns['index'][i],
+            'orientation': columns['orientation'][i],
+            'position': [columns['x'][i], columns['y'][i]],
+            'strata': columns['strata'][i],
+            'tile': names[columns['tile'][i]],
+            'tileset': names[columns['tileset'][i]]
+        })
+
+    return {**data, 'tiles': tiles}
+
+def encode_json(data, names, records):
+    encoder = json.JSONEncoder(indent=2, sort_keys=True)
+
+    parts = []
+    for start in range(0, len(records), JSON_SLICE):
+        tiles = write_json({}, names, records[start:start + JSON_SLICE])['tiles']
+        parts.append(encoder.encode(tiles)[1:-2].replace('\n', '\n  '))
+
+        time.sleep(0)
+
+    values = {k: encoder.encode(v).replace('\n', '\n  ') for k, v in data.items() if k != 'tiles'}
+    values['tiles'] = f'[{",".join(parts)}\n  ]' if parts else '[]'
+
+    fields = ',\n'.join(f'  {json.dumps(k)}: {values[k]}' for k in sorted(values))
+    return f'{{\n{fields}\n}}'.encode('utf-8')
+
+def get_chunk_dimensions(config):
+    return (config['tile']['dimensions'][0] * CHUNK_SIZE, config['tile']['dimensions'][1] * CHUNK_SIZE)
+
+def read_binary(buffer):
+    view = memoryview(buffer)
+
+    magic, version, _, length = HEADER.unpack_from(view, 0)
+    if magic != MAGIC or version not in (1, 2, VERSION):
+        raise ValueError(f'[formats::read_binary] Unsupported tilemap file ({magic}, {version})')
+
+    offset = HEADER.size
+    data = json.loads(bytes(view[offset:offset + length]))
+    offset += length
+
+    if version < 3:
+        data = {'config': data}
+
+    (count,) = struct.unpack_from('<I', view, offset)
+    offset += 4
+
+    names = []
+    for _ in range(count):
+        (length,) = struct.unpack_from('<H', view, offset)
+        names.append(str(view[offset + 2:offset + 2 + length], 'utf-8'))
+        offset += 2 + length
+
+    chunks = None
+    if version >= 2:
+        width, height, count = CHUNK_HEADER.unpack_from(view, offset)
+        offset += CHUNK_HEADER.size
+
+        table = numpy.frombuffer(view, CHUNK_DTYPE, count, offset)
+        offset += table.nbytes
+
+        if (width, height) == get_chunk_dimensions(data['config']):
+            chunks = {(x, y): (o, c) for x, y, o, c in table.tolist()}
+
+    (count,) = struct.unpack_from('<I', view, offset)
+    offset += 4
+
+    records = numpy.frombuffer(view, TILE_DTYPE, count, offset)
+    return data, names, records, chunks
+
+def write_binary(data, names, records):
+    width, height = get_chunk_dimensions(data['config'])
+
+    ids = (records['y'] // height).astype(numpy.int64) * (2 ** 31 // width) + records['x'] // width
+    order = numpy.argsort(ids, kind='stable')
+
+    records = numpy.ascontiguousarray(records[order], TILE_DTYPE)
+    ids = ids[order]
+
+    starts = numpy.flatnonzero(numpy.diff(ids, prepend=-1))
+
+    table = numpy.zeros(len(starts), CHUNK_DTYPE)
+    table['x'] = records['x'][starts] // width * width
+    table['y'] = records['y'][starts] // height * height
+    table['offset'] = starts
+    table['count'] = numpy.diff(starts, append=len(records))
+
+    data = json.dumps(data, sort_keys=True).encode('utf-8')
+    parts = [HEADER.pack(MAGIC, VERSION, 0, len(data)), data, struct.pack('<I', len(names))]
+
+    for name in names:
+        name = name.encode('utf-8')
+        parts.append(struct.pack('<H', len(name)) + name)
+
+    parts.append(CHUNK_HEADER.pack(width, height, len(table)))
+    parts.append(table.tobytes())
+
+    parts.append(struct.pack('<I', len(records)))
+    parts.append(records.tobytes())
+
+    return b''.join(parts)
@@ -0,0 +1,102 @@
+from scripts import HISTORY_LIMIT, HISTORY_BUDGET
+
+import numpy
+
+class History:
+    DTYPE = numpy.dtype([
+        ('op', 'S1'),
+        ('x', '<i4'),
+        ('y', '<i4'),
+        ('tileset', '<i4'),
+        ('index', '<i4'),
+        ('tile', '<i4'),
+        ('orientation', '<i2'),
+        ('strata', 'i1'),
+        ('flipped', '?')
+    ])
+
+    def __init__(self, limit=HISTORY_LIMIT, budget=HISTORY_BUDGET):
+        self.limit = limit
+        self.budget = budget
+
+        self.undos = []
+        self.redos = []
+
+        self.group = None
+        self.size = 0
+
+    def __len__(self):
+        return len(self.undos)
+
+    def clear(self):
+        self.undos.clear()
+        self.redos.clear()
+
+        self.group = None
+        self.size = 0
+
+    def record(self, name, op, columns):
+        if self.group and self.group[0] != name:
+            self.commit()
+
+        if not self.group:
+            self.group = (name, [])
+
+        records = numpy.zeros(len(columns['x']), self.DTYPE)
+        records['op'] = op
+
+        for key, column in columns.items():
+            records[key] = column
+
+        self.group[1].append(records)
+
+    def commit(self):
+        if not self.group:
+            return
+
+        name, parts = self.group
+        self.group = None
+
+        records = numpy.concatenate(parts)
+        if not len(records):
+            return
+
+        self.redos.clear()
+
+        self.undos.append((name, records))
+        self.size += len(records)
+
+        while len(self.undos) > self.limit or (self.size > self.budget and len(self.undos) > 1):
+            self.size -= len(self.undos.pop(0)[1])
+
+    def undo(self):
+        self.commit()
+        if not self.undos:
+            return
+
+        entry = self.undos.pop()
+        self.size -= len(entry[1])
+
+        self.redos.append(entry)
+        return entry
+
+    def redo(self):
+        self.commit()
+        if not self.redos:
+            return
+
+        entry = self.redos.pop()
+        self.size += len(entry[1])
+
+        self.undos.append(entry)
+        return entry
+
+    @staticmethod
+    def runs(records):
+        starts = numpy.flatnonzero(records['op'][1:] != records['op'][:-1]) + 1
+
+        runs = []
+        for part in numpy.split(records, starts):
+            runs.append((part['op'][0], {k: part[k] for k in History.DTYPE.names if k != 'op'}))
+
+        return runs
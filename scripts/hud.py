@@ -0,0 +1,76 @@
+from pge.core import Core
+
+import pygame
+
+class Label:
+    def __init__(self, bind, position, point='topleft', font='m3x6', spacing=4):
+        assert Core.instanced
+        self.core = Core()
+
+        self.bind = bind
+        self.position = position
+        self.point = point
+
+        self.font = font
+        self.spacing = spacing
+
+        self.value = None
+        self.surface = None
+        self.rect = None
+
+    def update(self):
+        value = self.bind()
+        if self.surface and value == self.value:
+            return False
+
+        self.value = value
+
+        lines = (value,) if isinstance(value, str) else value
+        images = [self.core.font_service.create(self.font, line) for line in lines]
+
+        width = max((i.get_width() for i in images), default=0)
+        height = max(sum(i.get_height() + self.spacing for i in images) - self.spacing, 0)
+
+        self.surface = pygame.Surface((width, height), pygame.SRCALPHA)
+
+        y = 0
+        for image in images:
+            self.surface.blit(image, (0, y))
+            y += image.get_height() + self.spacing
+
+        self.rect = self.surface.get_rect(**{self.point: self.position})
+        return True
+
+class Hud:
+    def __init__(self, offset=(0, 0)):
+        self.offset = offset
+
+        self.widgets = []
+        self.blits = []
+        self.rects = []
+
+        self.dirty = True
+
+    def add(self, widget):
+        self.widgets.append(widget)
+        self.dirty = True
+
+        return widget
+
+    def update(self):
+        self.rects = []
+
+        for widget in self.widgets:
+            rect = widget.rect
+            if not widget.update():
+                continue
+
+            self.rects += [r.move(self.offset) for r in (rect, widget.rect) if r]
+            self.dirty = True
+
+    def render(self, surface):
+        if self.dirty:
+            self.blits = [(w.surface, w.rect.move(self.offset)) for w in self.widgets]
+            self.dirty = False
+
+        surface.blits(self.blits, False)
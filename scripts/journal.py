@@ -0,0 +1,190 @@
+from scripts import formats
+
+import numpy
+import struct
+import zlib
+import os
+
+class Journal:
+    MAGIC = b'TMJL'
+    VERSION = 2
+
+    ADD = b'A'
+    REMOVE = b'R'
+    NAME = b'N'
+
+    HEADER = struct.Struct('<4sH')
+    ENTRY = struct.Struct('<cII')
+    ENTRY_V1 = struct.Struct('<cI')
+
+    def __init__(self, path):
+        self.path = path
+        self.old_path = f'{path}.old'
+
+        self.file = None
+        self.names = {}
+
+        self.size = os.path.getsize(path) if os.path.exists(path) else 0
+
+    def open(self):
+        if self.file:
+            return
+
+        self.repair()
+
+        self.file = open(self.path, 'ab')
+        self.names = {}
+
+        self.file.write(self.HEADER.pack(self.MAGIC, self.VERSION))
+        self.size += self.HEADER.size
+
+    def close(self):
+        if not self.file:
+            return
+
+        self.flush()
+
+        self.file.close()
+        self.file = None
+
+    def write(self, op, names, columns):
+        self.open()
+
+        records = numpy.zeros(len(columns['x']), formats.TILE_DTYPE)
+        for name, column in columns.items():
+            records[name] = column
+
+        parts = []
+        for name in ('tileset', 'tile'):
+            unique = numpy.unique(records[name])
+
+            for i in unique.tolist():
+                if names[i] not in self.names:
+                    self.names[names[i]] = len(self.names)
+
+                    encoded = names[i].encode('utf-8')
+                    parts.append(self.pack(self.NAME, len(encoded), encoded))
+
+            ids = numpy.zeros(unique[-1] + 1 if len(unique) else 0, numpy.int32)
+            ids[unique] = [self.names[names[i]] for i in unique.tolist()]
+            records[name] = ids[records[name]]
+
+        parts.append(self.pack(op, len(records), records.tobytes()))
+
+        data = b''.join(parts)
+        self.file.write(data)
+        self.file.flush()
+
+        self.size += len(data)
+
+    def pack(self, op, count, payload):
+        return self.ENTRY.pack(op, count, zlib.crc32(payload)) + payload
+
+    def repair(self):
+        if not os.path.exists(self.path):
+            self.size = 0
+            return
+
+        with open(self.path, 'rb') as f:
+            _, end = self.parse(f.read())
+
+        if end < os.path.getsize(self.path):
+            with open(self.path, 'r+b') as f:
+                f.truncate(end)
+                os.fsync(f.fileno())
+
+        self.size = end
+
+    def flush(self):
+        if not self.file:
+            return
+
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def rotate(self):
+        self.close()
+        self.repair()
+
+        if not os.path.exists(self.path):
+            return
+
+        if os.path.exists(self.old_path):
+            with open(self.path, 'rb') as current, open(self.old_path, 'ab') as old:
+                old.write(current.read())
+                old.flush()
+                os.fsync(old.fileno())
+
+            os.remove(self.path)
+        else:
+            os.replace(self.path, self.old_path)
+
+        self.size = 0
+
+    def discard(self):
+        if os.path.exists(self.old_path):
+            os.remove(self.old_path)
+
+    def pending(self):
+        return self.size > 0 or os.path.exists(self.old_path)
+
+    def read(self):
+        entries = []
+        for path in (self.old_path, self.path):
+            if not os.path.exists(path):
+                continue
+
+            with open(path, 'rb') as f:
+                entries.extend(self.parse(f.read())[0])
+
+        return entries
+
+    @classmethod
+    def parse(cls, buffer):
+        view = memoryview(buffer)
+        offset = end = 0
+
+        entry = cls.ENTRY
+        names = []
+        entries = []
+
+        while offset < len(view):
+            if bytes(view[offset:offset + 4]) == cls.MAGIC:
+                if offset + cls.HEADER.size > len(view):
+                    break
+
+                _, version = cls.HEADER.unpack_from(view, offset)
+                if version not in (1, cls.VERSION):
+                    break
+
+                entry = cls.ENTRY if version == cls.VERSION else cls.ENTRY_V1
+                names = []
+
+                offset += cls.HEADER.size
+                end = offset
+                continue
+
+            if offset + entry.size > len(view):
+                break
+
+            op, count, *checksum = entry.unpack_from(view, offset)
+            start = offset + entry.size
+
+            if op == cls.NAME:
+                size = count
+            elif op in (cls.ADD, cls.REMOVE):
+                size = count * formats.TILE_DTYPE.itemsize
+            else:
+                break
+
+            if start + size > len(view) or checksum and zlib.crc32(view[start:start + size]) != checksum[0]:
+                break
+
+            if op == cls.NAME:
+                names.append(str(view[start:start + size], 'utf-8'))
+            else:
+                entries.append((op, list(names), numpy.frombuffer(view, formats.TILE_DTYPE, count, start)))
+
+            offset = end = start + size
+
+        return entries, end
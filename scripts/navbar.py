@@ -1,4 +1,4 @@
-from pge.core import Core
+from pge.core import Core, Trace
 from pge.types import Singleton
 from pge.containers import SpriteList
 from pge.utils import scale
@@ -34,6 +34,10 @@ class Navbar:
 
         self.buttons = SpriteList([v for k, v in self.__dict__.items() if 'button' in k])
 
+        self.composite = self.surface.copy()
+        self.composite_key = None
+
+    @Trace().traced()
     def load(self, data):
         ...
 
@@ -41,5 +45,12 @@ class Navbar:
         self.buttons.update_all()
 
     def render(self):
-        self.core.screen.blit(self.surface, self.rect)
-        self.buttons.render_all()
\ No newline at end of file
+        key = tuple(b.alpha for b in self.buttons)
+        if key != self.composite_key:
+            self.composite_key = key
+            self.core.mark_dirty(self.rect)
+
+            self.composite.blit(self.surface, (0, 0))
+            self.buttons.render_all(self.composite, (-self.rect.left, -self.rect.top))
+
+        self.core.screen.blit(self.composite, self.rect)
\ No newline at end of file
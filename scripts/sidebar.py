@@ -1,4 +1,4 @@
-from pge.core import Core
+from pge.core import Core, Trace
 from pge.types import Singleton
 
 from scripts import SCREEN_DIMENSIONS
@@ -27,6 +27,9 @@ class Sidebar:
         self.page = 0
         self.page_text = None
 
+        self.composite = self.surface.copy()
+        self.composite_key = None
+
         self.selected = None
 
         self.core.input_service.connect(pygame.K_d, pygame.KEYDOWN, self.increment)
@@ -35,6 +38,7 @@ class Sidebar:
     def select(self, data):
         self.selected = data
 
+    @Trace().traced()
     def load(self, data):
         tilesets = data['config']['images']
         for tileset in tilesets:
@@ -63,6 +67,7 @@ class Sidebar:
                 self.selected = {'tile': tile, 'tileset': tileset, 'index': i}
 
         self.button_keys = tuple(self.buttons.keys())
+        self.composite_key = None
 
     def increment(self):
         if not self.tmedit.tilemap:
@@ -86,18 +91,26 @@ class Sidebar:
         if not self.tmedit.tilemap:
             return
         
-        self.page_text = self.core.font_service.create('m3x6', self.button_keys[self.page], 1)
         for button in self.buttons[self.button_keys[self.page]]:
             button.update()
 
     def render(self):
-        self.core.screen.blit(self.surface, self.rect)
-
         if not self.tmedit.tilemap:
+            self.core.screen.blit(self.surface, self.rect)
             return
+        
+        buttons = self.buttons[self.button_keys[self.page]]
 
-        if self.page_text:
-            self.core.screen.blit(self.page_text, (self.rect.left + 6, self.rect.top + 6))
+        key = (self.page, tuple(b.alpha for b in buttons))
+        if key != self.composite_key:
+            self.composite_key = key
+            self.core.mark_dirty(self.rect)
+            self.page_text = self.core.font_service.create('m3x6', self.button_keys[self.page], 1)
 
-        for button in self.buttons[self.button_keys[self.page]]:
-            button.render()
\ No newline at end of file
+            self.composite.blit(self.surface, (0, 0))
+            self.composite.blit(self.page_text, (6, 6))
+
+            for button in buttons:
+                button.render(self.composite, (-self.rect.left, -self.rect.top))
+
+        self.core.screen.blit(self.composite, self.rect)
\ No newline at end of file
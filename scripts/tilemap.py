@@ -0,0 +1,507 @@
+from scripts import CHUNK_SURFACES, CHUNK_PREFETCH, TILE_BUDGET, IMAGE_CACHE_SIZE
+from scripts import TileStore, Journal
+from scripts import formats
+
+import collections
+import itertools
+import dataclasses
+import pygame
+import numpy
+
+def unique_rows(rows):
+    rows = numpy.sort(rows)
+    return rows[numpy.diff(rows, prepend=-1) > 0]
+
+@dataclasses.dataclass
+class Chunk:
+    rect: pygame.Rect
+    rows: set = dataclasses.field(default_factory=set)
+
+    surfaces: dict = dataclasses.field(default_factory=dict)
+
+    loaded: bool = True
+    modified: int = 0
+    
+    def clear(self):
+        self.surfaces.clear()
+
+@dataclasses.dataclass
+class Tilemap:
+    data: dict
+    images: dict
+
+    rect: pygame.Rect
+    bounds: pygame.Vector2
+
+    chunks: dict
+    chunk_dimensions: tuple
+
+    path: str = None
+    file: str = None
+
+    store: TileStore = dataclasses.field(default_factory=TileStore)
+
+    cells: dict = dataclasses.field(default_factory=dict)
+    loose: dict = dataclasses.field(default_factory=dict)
+
+    image_cache: collections.OrderedDict = dataclasses.field(default_factory=collections.OrderedDict)
+
+    edits: int = 0
+    journal: Journal = None
+
+    source_records: numpy.ndarray = None
+    source_chunks: dict = None
+    source_ids: numpy.ndarray = None
+
+    def get_image(self, tileset, index, orientation=0, flipped=False):
+        key = (tileset, index, orientation % 360, bool(flipped))
+        if key in self.image_cache:
+            self.image_cache.move_to_end(key)
+            return self.image_cache[key]
+        
+        image = pygame.transform.rotate(self.images[tileset][index], -orientation)
+        image = pygame.transform.flip(image, flipped, False)
+        image.set_colorkey((0, 0, 0))
+
+        return self.cache_image(key, image)
+    
+    def get_overlay(self, tileset, index, orientation=0, flipped=False, color=(255, 255, 255, 55)):
+        key = (tileset, index, orientation % 360, bool(flipped), tuple(color))
+        if key in self.image_cache:
+            self.image_cache.move_to_end(key)
+            return self.image_cache[key]
+        
+        image = pygame.mask.from_surface(self.get_image(tileset, index, orientation, flipped)).to_surface(setcolor=color, unsetcolor=(0, 0, 0, 0))
+        return self.cache_image(key, image)
+
+    def cache_image(self, key, image):
+        self.image_cache[key] = image
+        if len(self.image_cache) > IMAGE_CACHE_SIZE:
+            self.image_cache.popitem(last=False)
+
+        return image
+
+    def get_chunk_key(self, position):
+        width, height = self.chunk_dimensions
+        return (int(position[0] // width) * width, int(position[1] // height) * height)
+
+    def get_chunk(self, position):
+        return self.chunks.get(self.get_chunk_key(position))
+
+    def get_chunk_keys(self, rect):
+        width, height = self.chunk_dimensions
+
+        left, top = self.get_chunk_key(rect.topleft)
+        right, bottom = self.get_chunk_key((rect.right - 1, rect.bottom - 1))
+
+        keys = []
+        for y in range(top, bottom + 1, height):
+            for x in range(left, right + 1, width):
+                if (x, y) in self.chunks:
+                    keys.append((x, y))
+
+        return keys
+    
+    def get_cell(self, position):
+        width, height = self.data['config']['tile']['dimensions']
+        return (int(position[0] // width), int(position[1] // height))
+    
+    def get_cells(self, strata):
+        if strata not in self.cells:
+            columns, rows = self.data['config']['tilemap']['dimensions']
+            self.cells[strata] = numpy.full((rows, columns), -1, numpy.int32)
+
+        return self.cells[strata]
+
+    def get_cell_row(self, cell, strata):
+        columns, rows = self.data['config']['tilemap']['dimensions']
+        if strata not in self.cells or not (0 <= cell[0] < columns and 0 <= cell[1] < rows):
+            return None
+        
+        row = int(self.cells[strata][cell[1], cell[0]])
+        return row if row >= 0 else None
+
+    def get_cell_rows(self, x, y, strata):
+        columns, rows = self.data['config']['tilemap']['dimensions']
+        x, y, strata = numpy.broadcast_arrays(x, y, strata)
+
+        result = numpy.full(x.shape, -1, numpy.int64)
+        inside = (x >= 0) & (x < columns) & (y >= 0) & (y < rows)
+
+        for value in numpy.unique(strata[inside]).tolist():
+            if value not in self.cells:
+                continue
+
+            mask = inside & (strata == value)
+            result[mask] = self.cells[value][y[mask], x[mask]]
+
+        return result
+
+    def get_occupancy(self, strata):
+        width, height = self.data['config']['tile']['dimensions']
+        columns, rows = self.data['config']['tilemap']['dimensions']
+
+        grid = self.get_cells(strata) >= 0
+        if not self.source_chunks:
+            return grid
+        
+        for part in (self.get_source(k) for k, c in self.chunks.items() if not c.loaded and k in self.source_chunks):
+            x, y = part['x'], part['y']
+
+            mask = (part['strata'] == strata) & (x % width == 0) & (y % height == 0)
+            mask &= (x >= 0) & (x < columns * width) & (y >= 0) & (y < rows * height)
+
+            grid[y[mask] // height, x[mask] // width] = True
+
+        return grid
+
+    def get_row(self, position, strata):
+        cell = self.get_cell(position)
+
+        rows = self.loose.get(self.get_chunk_key(position), [])
+
+        row = self.get_cell_row(cell, strata)
+        if row != None:
+            rows = [row] + rows
+
+        x, y = self.store.columns['x'], self.store.columns['y']
+        for row in rows:
+            if self.store.columns['strata'][row] != strata:
+                continue
+
+            data = self.store.get(row)
+            image = self.get_image(data['tileset'], data['index'], data['orientation'], data['flipped'])
+
+            if pygame.Rect((x[row], y[row]), image.get_size()).collidepoint(position):
+                return row
+
+    def modify(self, key):
+        self.edits += 1
+
+        self.chunks[key].clear()
+        self.chunks[key].modified = self.edits
+
+    def get_chunk_ids(self, x, y):
+        width, height = self.chunk_dimensions
+        return (numpy.asarray(y) // height).astype(numpy.int64) * (self.rect.width // width + 1) + numpy.asarray(x) // width
+
+    def get_position_keys(self, x, y):
+        width, height = self.chunk_dimensions
+        columns = self.rect.width // width + 1
+
+        ids = numpy.unique(self.get_chunk_ids(x, y))
+        keys = zip((ids % columns * width).tolist(), (ids // columns * height).tolist())
+
+        return [k for k in keys if k in self.chunks]
+
+    def group_rows(self, rows):
+        if not len(rows):
+            return
+        
+        ids = self.get_chunk_ids(self.store.columns['x'][rows], self.store.columns['y'][rows])
+        order = numpy.argsort(ids, kind='stable')
+
+        for chunk_rows in numpy.split(rows[order], numpy.flatnonzero(numpy.diff(ids[order])) + 1):
+            yield self.get_chunk_key((self.store.columns['x'][chunk_rows[0]], self.store.columns['y'][chunk_rows[0]])), chunk_rows
+
+    def add_tiles(self, columns, modify=True):
+        x, y = numpy.asarray(columns['x']), numpy.asarray(columns['y'])
+        mask = (x >= 0) & (x < self.rect.width) & (y >= 0) & (y < self.rect.height)
+
+        rows = self.store.insert_many({k: numpy.asarray(v)[mask] for k, v in columns.items()})
+
+        for key, chunk_rows in self.group_rows(rows):
+            self.chunks[key].rows.update(chunk_rows.tolist())
+            self.chunks[key].clear()
+
+            if modify:
+                self.modify(key)
+
+        self.index_rows(rows)
+
+        if modify:
+            self.record(Journal.ADD, rows)
+
+        return rows
+    
+    def add_records(self, names, records):
+        ids = numpy.array([self.store.intern(n) for n in names] or [0], numpy.int32)
+
+        columns = {name: records[name] for name in self.store.columns}
+        for name in self.store.NAMES:
+            columns[name] = ids[records[name]]
+
+        return self.add_tiles(columns)
+    
+    def get_records(self, rows=None):
+        columns = self.store.snapshot(rows)
+
+        if rows is None and self.source_chunks:
+            parts = [self.get_source(k) for k, c in self.chunks.items() if not c.loaded]
+            columns = {k: numpy.concatenate([v] + [p[k] for p in parts]) for k, v in columns.items()}
+
+        records = numpy.zeros(len(columns['x']), formats.TILE_DTYPE)
+        for name, column in columns.items():
+            records[name] = column
+
+        variants = columns['tileset'].astype(numpy.int64) << 41 | columns['index'].astype(numpy.int64) << 9 | columns['orientation'] % 360
+        variants, inverse = numpy.unique(variants, return_inverse=True)
+
+        variants = zip((variants >> 41).tolist(), (variants >> 9 & 0xFFFFFFFF).tolist(), (variants & 0x1FF).tolist())
+        dimensions = numpy.array([self.get_image(self.store.names[t], i, o).get_size() for t, i, o in variants] or [(0, 0)])
+        records['width'], records['height'] = dimensions[inverse.reshape(-1)].T
+
+        return self.store.names, records
+
+    def open(self, names, records, chunks, edits=None):
+        reopen = self.source_chunks != None
+
+        self.source_records = records
+        self.source_chunks = chunks
+        self.source_ids = numpy.array([self.store.intern(n) for n in names] or [0], numpy.int32)
+
+        for key, chunk in self.chunks.items():
+            if not reopen:
+                chunk.loaded = bool(chunk.rows) or key not in chunks
+
+            if edits == None or chunk.modified <= edits:
+                chunk.modified = 0
+
+    def get_source(self, key):
+        offset, count = self.source_chunks[key]
+        records = self.source_records[offset:offset + count]
+
+        columns = {name: records[name] for name in self.store.columns}
+        for name in self.store.NAMES:
+            columns[name] = self.source_ids[records[name]]
+
+        return columns
+
+    def release_source(self):
+        if self.source_records is None or self.source_records.flags.owndata:
+            return
+        
+        self.source_records = self.source_records.copy()
+
+    def load_rect(self, rect):
+        keys = self.get_chunk_keys(rect)
+        for key in keys:
+            self.load_chunk(key)
+
+        return keys
+
+    def get_rows(self, rect, strata=None):
+        keys = self.load_rect(rect)
+
+        rows = numpy.fromiter(itertools.chain.from_iterable(self.chunks[k].rows for k in keys), numpy.int64)
+        return self.store.query((rect.x, rect.y, rect.width, rect.height), strata, rows=rows)
+    
+    def get_covered(self, columns):
+        width, height = self.data['config']['tile']['dimensions']
+        x, y, strata = (numpy.asarray(columns[k]) for k in ('x', 'y', 'strata'))
+
+        snapped = (x % width == 0) & (y % height == 0)
+        rows = self.get_cell_rows(x[snapped] // width, y[snapped] // height, strata[snapped])
+
+        return unique_rows(rows[rows >= 0])
+
+    def load_chunk(self, key):
+        chunk = self.chunks[key]
+        if chunk.loaded:
+            return
+        
+        self.add_tiles(self.get_source(key), False)
+        chunk.loaded = True
+
+    def unload_chunk(self, key):
+        chunk = self.chunks[key]
+        if not chunk.loaded or chunk.modified or key not in self.source_chunks:
+            return
+        
+        self.remove_rows(numpy.fromiter(chunk.rows, numpy.int64, len(chunk.rows)), False)
+        chunk.loaded = False
+
+    def stream(self, rect):
+        if not self.source_chunks:
+            return
+        
+        width, height = self.chunk_dimensions
+        keys = self.get_chunk_keys(rect.inflate(width * CHUNK_PREFETCH * 2, height * CHUNK_PREFETCH * 2))
+
+        for key in keys:
+            self.load_chunk(key)
+
+        if len(self.store) <= TILE_BUDGET:
+            return
+        
+        keys = set(keys)
+        distance = lambda k: (k[0] + width / 2 - rect.centerx) ** 2 + (k[1] + height / 2 - rect.centery) ** 2
+
+        for key in sorted((k for k, c in self.chunks.items() if c.loaded and k not in keys), key=distance, reverse=True):
+            if len(self.store) <= TILE_BUDGET:
+                break
+
+            self.unload_chunk(key)
+
+    def remove_rows(self, rows, modify=True):
+        if modify:
+            self.record(Journal.REMOVE, rows)
+
+        for key, chunk_rows in self.group_rows(rows):
+            self.chunks[key].rows.difference_update(chunk_rows.tolist())
+            self.chunks[key].clear()
+
+            if modify:
+                self.modify(key)
+
+        self.unindex_rows(rows)
+        self.store.remove_many(rows)
+
+    def record(self, op, rows):
+        if self.journal and len(rows):
+            self.journal.write(op, self.store.names, self.store.snapshot(rows))
+
+    def replay(self, entries):
+        for op, names, records in entries:
+            ids = numpy.array([self.store.intern(n) for n in names] or [0], numpy.int32)
+
+            columns = {name: records[name] for name in self.store.columns}
+            for name in self.store.NAMES:
+                columns[name] = ids[records[name]]
+
+            self.apply(op, columns)
+
+    def apply(self, op, columns):
+        for key in self.get_position_keys(columns['x'], columns['y']):
+            self.load_chunk(key)
+
+        rows = self.find_rows(columns)
+
+        if op == Journal.ADD:
+            return self.add_tiles({k: numpy.asarray(v)[rows < 0] for k, v in columns.items()})
+        
+        rows = unique_rows(rows[rows >= 0])
+        self.remove_rows(rows)
+
+        return rows
+    
+    def find_rows(self, columns):
+        width, height = self.data['config']['tile']['dimensions']
+        x, y, strata = (columns[k] for k in ('x', 'y', 'strata'))
+
+        rows = self.get_cell_rows(numpy.asarray(x) // width, numpy.asarray(y) // height, strata)
+
+        candidates = numpy.maximum(rows, 0)
+        found = (rows >= 0) & self.store.alive[candidates]
+
+        for name, column in self.store.columns.items():
+            found &= column[candidates] == columns[name]
+
+        rows[~found] = -1
+
+        missing = numpy.flatnonzero(~found)
+        keys = self.get_position_keys(x[missing], y[missing])
+
+        loose = numpy.fromiter(itertools.chain.from_iterable(self.loose.get(k, ()) for k in keys), numpy.int64)
+        if len(loose):
+            values = zip(*(column[loose].tolist() for column in self.store.columns.values()))
+            index = dict(zip(values, loose.tolist()))
+
+            values = zip(*(numpy.asarray(columns[name])[missing].tolist() for name in self.store.columns))
+            for i, value in zip(missing.tolist(), values):
+                rows[i] = index.get(value, -1)
+
+        return rows
+
+    def index_rows(self, rows):
+        width, height = self.data['config']['tile']['dimensions']
+        x, y, strata = (self.store.columns[k][rows] for k in ('x', 'y', 'strata'))
+
+        snapped = (x % width == 0) & (y % height == 0)
+        loose = [rows[~snapped]]
+
+        x, y, strata, rows = x[snapped] // width, y[snapped] // height, strata[snapped], rows[snapped]
+        for value in numpy.unique(strata).tolist():
+            mask = strata == value
+            cells = self.get_cells(value)
+
+            cx, cy, cell_rows = x[mask], y[mask], rows[mask]
+            empty = cells[cy, cx] < 0
+
+            cells[cy[empty], cx[empty]] = cell_rows[empty]
+            loose.append(cell_rows[cells[cy, cx] != cell_rows])
+
+        for key, chunk_rows in self.group_rows(numpy.concatenate(loose)):
+            self.loose.setdefault(key, []).extend(chunk_rows.tolist())
+
+    def unindex_rows(self, rows):
+        width, height = self.data['config']['tile']['dimensions']
+        x, y, strata = (self.store.columns[k][rows] for k in ('x', 'y', 'strata'))
+
+        snapped = (x % width == 0) & (y % height == 0)
+        loose = [rows[~snapped]]
+
+        x, y, strata, rows = x[snapped] // width, y[snapped] // height, strata[snapped], rows[snapped]
+        for value in numpy.unique(strata).tolist():
+            mask = strata == value
+            cells = self.get_cells(value)
+
+            cx, cy, cell_rows = x[mask], y[mask], rows[mask]
+            owned = cells[cy, cx] == cell_rows
+
+            cells[cy[owned], cx[owned]] = -1
+            loose.append(cell_rows[~owned])
+
+        for key, chunk_rows in self.group_rows(numpy.concatenate(loose)):
+            removed = set(chunk_rows.tolist())
+            self.loose[key] = [r for r in self.loose.get(key, ()) if r not in removed]
+
+    def bake_chunk(self, key, strata=None):
+        chunk = self.chunks[key]
+        if strata in chunk.surfaces:
+            return chunk.surfaces[strata]
+        
+        if len(chunk.surfaces) >= CHUNK_SURFACES:
+            del chunk.surfaces[next(iter(chunk.surfaces))]
+
+        rows = numpy.fromiter(chunk.rows, numpy.int64, len(chunk.rows))
+        rows = rows[numpy.lexsort((rows, self.store.columns['strata'][rows]))]
+
+        columns = {k: v[rows].tolist() for k, v in self.store.columns.items()}
+        names = self.store.names
+
+        rect = pygame.Rect(chunk.rect)
+        blits = []
+
+        for i in range(len(rows)):
+            image = self.get_image(names[columns['tileset'][i]], columns['index'][i], columns['orientation'][i], columns['flipped'][i])
+            position = (columns['x'][i], columns['y'][i])
+
+            rect.union_ip((position, image.get_size()))
+            blits.append((image, position, columns['strata'][i]))
+
+        surface = pygame.Surface(rect.size, pygame.SRCALPHA)
+
+        i = 0
+        while i < len(blits):
+            j = i
+            while j < len(blits) and blits[j][2] == blits[i][2]:
+                j += 1
+
+            images = set(b[0] for b in blits[i:j]) if strata != None and strata != blits[i][2] else ()
+            for image in images:
+                image.set_alpha(55)
+
+            surface.blits([(b[0], (b[1][0] - rect.x, b[1][1] - rect.y)) for b in blits[i:j]], False)
+
+            for image in images:
+                image.set_alpha(255)
+
+            i = j
+
+        chunk.surfaces[strata] = (surface, rect)
+        return chunk.surfaces[strata]
+
+    def render_chunk(self, key, surface, strata=None, offset=(0, 0)):
+        baked, rect = self.bake_chunk(key, strata)
+        surface.blit(baked, rect.move(offset), special_flags=pygame.BLEND_PREMULTIPLIED)
@@ -0,0 +1,116 @@
+import numpy
+
+class TileStore:
+    COLUMNS = {
+        'x': numpy.int32,
+        'y': numpy.int32,
+        'strata': numpy.int8,
+        'tileset': numpy.int32,
+        'index': numpy.int32,
+        'orientation': numpy.int16,
+        'flipped': numpy.bool_,
+        'tile': numpy.int32
+    }
+
+    NAMES = ('tileset', 'tile')
+
+    def __init__(self, capacity=1024):
+        self.columns = {k: numpy.zeros(capacity, v) for k, v in self.COLUMNS.items()}
+        self.alive = numpy.zeros(capacity, numpy.bool_)
+
+        self.size = 0
+        self.count = 0
+        self.free = []
+
+        self.names = []
+        self.name_ids = {}
+
+    def __len__(self):
+        return self.count
+
+    def intern(self, name):
+        if name not in self.name_ids:
+            self.name_ids[name] = len(self.names)
+            self.names.append(name)
+
+        return self.name_ids[name]
+
+    def intern_many(self, names):
+        return numpy.fromiter((self.intern(n) for n in names), numpy.int32)
+
+    def reserve(self, size):
+        capacity = len(self.alive)
+        if size <= capacity:
+            return
+
+        while capacity < size:
+            capacity *= 2
+
+        for name, column in self.columns.items():
+            self.columns[name] = numpy.zeros(capacity, column.dtype)
+            self.columns[name][:self.size] = column[:self.size]
+
+        alive = self.alive
+        self.alive = numpy.zeros(capacity, numpy.bool_)
+        self.alive[:self.size] = alive[:self.size]
+
+    def insert_many(self, columns):
+        length = len(columns['x'])
+
+        reused = min(length, len(self.free))
+        fresh = length - reused
+
+        rows = numpy.empty(length, numpy.int64)
+        rows[:reused] = self.free[len(self.free) - reused:]
+        rows[reused:] = numpy.arange(self.size, self.size + fresh)
+
+        del self.free[len(self.free) - reused:]
+        self.reserve(self.size + fresh)
+
+        for name, column in self.columns.items():
+            column[rows] = columns[name]
+
+        self.alive[rows] = True
+
+        self.size += fresh
+        self.count += length
+
+        return rows
+
+    def remove_many(self, rows):
+        rows = rows[self.alive[rows]]
+
+        self.alive[rows] = False
+        self.free.extend(rows.tolist())
+        self.count -= len(rows)
+
+    def get(self, row):
+        data = {name: column[row].item() for name, column in self.columns.items()}
+        for name in self.NAMES:
+            data[name] = self.names[data[name]]
+
+        return data
+
+    def query(self, rect=None, strata=None, tileset=None, rows=None):
+        if rows is None:
+            rows = numpy.flatnonzero(self.alive[:self.size])
+
+        mask = numpy.ones(len(rows), numpy.bool_)
+
+        if rect != None:
+            x, y = self.columns['x'][rows], self.columns['y'][rows]
+            mask &= (x >= rect[0]) & (x < rect[0] + rect[2]) & (y >= rect[1]) & (y < rect[1] + rect[3])
+
+        if strata != None:
+            mask &= self.columns['strata'][rows] == strata
+
+        if tileset != None:
+            mask &= self.columns['tileset'][rows] == self.name_ids.get(tileset, -1)
+
+        return rows[mask]
+
+    def snapshot(self, rows=None):
+        if rows is None:
+            rows = self.query()
+
+        return {name: column[rows] for name, column in self.columns.items()}
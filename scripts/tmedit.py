@@ -1,31 +1,25 @@
-from pge.core import Core
+from pge.core import Core, Trace
 from pge.types import Singleton
 from pge.utils import Easings, clamp, load_spritesheet, scale
 from pge.containers import SpriteList
 
-from scripts import SCREEN_DIMENSIONS, SCREEN_COLOR, IMAGE_PATH
-from scripts import Alert, Tile
+from scripts import SCREEN_DIMENSIONS, SCREEN_COLOR, IMAGE_PATH, CHUNK_SIZE, AUTOSAVE_INTERVAL, JOURNAL_LIMIT, TRACE_FRAMES, PROFILE_FRAMES
+from scripts import Alert, Label, Hud, Chunk, Tilemap, Journal, History
 from scripts import Sidebar, Navbar
 from scripts import TOOLS
+from scripts import formats
 
 from tkinter import filedialog
 
-import dataclasses
+import concurrent.futures
 import pygame
 import pygame.gfxdraw
+import struct
+import copy
 import json
+import time
 import os
 
-@dataclasses.dataclass
-class Tilemap:
-    data: dict
-    images: dict
-
-    surface: pygame.Surface
-    bounds: pygame.Vector2
-
-    chunks: dict
-
 @Singleton
 class Tmedit:
     def __init__(self):
@@ -38,11 +32,20 @@ class Tmedit:
         self.navbar = Navbar(self)
 
         self.tilemap = None
-        self.path = None
+
+        self.saver = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self.saves = []
+
+        self.autosave = AUTOSAVE_INTERVAL
+        self.autosave_time = time.time()
+        self.autosave_edits = 0
 
         self.viewport = pygame.Rect(0, 0, SCREEN_DIMENSIONS[0] - self.sidebar.rect.width, SCREEN_DIMENSIONS[1] - self.navbar.rect.height)
         self.fill = pygame.Rect(0, 0, SCREEN_DIMENSIONS[0] - self.sidebar.rect.width, SCREEN_DIMENSIONS[1] - self.navbar.rect.height)
 
+        self.surface = pygame.Surface(self.viewport.size).convert_alpha()
+        self.grid = None
+
         self.prev_viewport = pygame.Vector2((-1, -1))
 
         self.offset_anchor = None
@@ -55,11 +58,24 @@ class Tmedit:
         self.mouse_focus = True
 
         self.renderable_chunks = []
+        self.cursor = None
+        self.view = None
 
         self.alerts = SpriteList()
         self.alert_y = 0
 
-        self.actions = []
+        self.history = History()
+
+        self.hud = Hud((self.sidebar.rect.right, self.navbar.rect.bottom))
+
+        self.hud.add(Label(lambda: tuple(f'{k}: {v}' for k, v in self.settings.items()), (6, 4)))
+        self.hud.add(Label(lambda: tuple(m for m in reversed(self.modes) if self.modes[m]), (6, self.viewport.height - 4), 'bottomleft'))
+        self.hud.add(Label(lambda: f'{round(self.mouse_position.x), round(self.mouse_position.y)}', (self.viewport.width - 6, self.viewport.height - 4), 'bottomright'))
+        self.hud.add(Label(self.get_timings, (self.viewport.width - 6, 4), 'topright'))
+
+        self.show_timings = False
+        self.timings = ()
+        self.timings_time = 0
 
         self.tools = { k.lower(): v(self) for k, v in TOOLS.items() }
         self.tool = ('move', self.tools['move'])
@@ -89,13 +105,20 @@ class Tmedit:
             return
         
         self.tool[1].on_mouse_up(event)
+        self.history.commit()
+
+    def cancel(self):
+        if not self.tilemap:
+            return
+        
+        self.tool[1].cancel()
+        self.history.commit()
            
     def on_tool(self, key):
         if pygame.key.get_mods() & pygame.KMOD_ALT:
             return
         
-        event = pygame.event.Event(pygame.MOUSEBUTTONUP, button=1)
-        self.on_mouse_up(event)
+        self.cancel()
 
         for name, tool in self.tools.items():
             if key != tool.keybind:
@@ -115,9 +138,21 @@ class Tmedit:
                 self.modes['strata filtering'] = not self.modes['strata filtering']
 
         elif pygame.key.get_mods() & pygame.KMOD_CTRL and not pygame.key.get_mods() & pygame.KMOD_ALT:
-            if key == pygame.K_z:
+            if key == pygame.K_z and pygame.key.get_mods() & pygame.KMOD_SHIFT or key == pygame.K_y:
+                self.redo()
+
+            elif key == pygame.K_z:
                 self.undo()
 
+            elif key == pygame.K_c and self.tool[0] == 'select':
+                self.tool[1].copy()
+
+            elif key == pygame.K_x and self.tool[0] == 'select':
+                self.tool[1].cut()
+
+            elif key == pygame.K_v and self.tool[0] == 'select':
+                self.tool[1].paste()
+
         elif not pygame.key.get_mods() & pygame.KMOD_CTRL and not pygame.key.get_mods() & pygame.KMOD_ALT:
             try:
                 self.settings['strata'] = clamp(int(pygame.key.name(key)), 0, 9)
@@ -129,16 +164,57 @@ class Tmedit:
 
             if key == pygame.K_t:
                 self.settings['flipped'] = not self.settings['flipped']
+
+            if key == pygame.K_F3:
+                self.show_timings = not self.show_timings
+
+            if key == pygame.K_F4:
+                self.trace()
+
+            if key == pygame.K_F5:
+                self.profile()
     
+    def trace(self):
+        path = os.path.join(self.tilemap.path, f'trace-{time.strftime("%Y%m%d-%H%M%S")}.json')
+        self.core.trace_service.capture(TRACE_FRAMES, path)
+
+        self.alert(f'Tracing {TRACE_FRAMES} frames')
+
+    def profile(self):
+        path = os.path.join(self.tilemap.path, f'profile-{time.strftime("%Y%m%d-%H%M%S")}.pstats')
+        self.core.trace_service.profile(PROFILE_FRAMES, path)
+
+        self.alert(f'Profiling {PROFILE_FRAMES} frames')
+
     def undo(self):
-        if not self.actions:
+        entry = self.history.undo()
+        if not entry:
             return
         
-        action = self.actions[-1]
-        self.tools[action[0]].undo(action)
+        for op, columns in reversed(History.runs(entry[1])):
+            self.tilemap.apply(Journal.REMOVE if op == Journal.ADD else Journal.ADD, columns)
 
-        self.alert(f'Undo: {action[0]}')
-        self.actions.pop()
+        self.alert(f'Undo: {entry[0]}')
+
+    def redo(self):
+        entry = self.history.redo()
+        if not entry:
+            return
+        
+        for op, columns in History.runs(entry[1]):
+            self.tilemap.apply(op, columns)
+
+        self.alert(f'Redo: {entry[0]}')
+
+    def get_timings(self):
+        if not self.show_timings:
+            return ()
+        
+        if time.time() - self.timings_time >= 0.5:
+            self.timings = self.core.timings.report()
+            self.timings_time = time.time()
+
+        return self.timings
 
     def alert(self, message, duration=180):
         position = (self.sidebar.rect.right + self.viewport.width // 2, self.navbar.rect.bottom + 6 + (25 * self.alert_y))
@@ -147,109 +223,155 @@ class Tmedit:
         self.alerts.append(alert)
         self.alert_y += 1
 
+    @Trace().traced()
     def save(self, alert=False):
         if not self.tilemap:
             return
         
-        tiles = [t for s in [c[1] for c in self.tilemap.chunks.values()] for t in s]
-        
-        tile_data = []
-        for tile in tiles:
-            data = {
-                'dimensions': tile._dimensions,
-                'flipped': tile.flipped,
-                'index': tile.image_index,
-                'orientation': tile.orientation,
-                'position': [round(tile.position.x), round(tile.position.y)],
-                'strata': tile.strata,
-                'tile': tile.tile,
-                'tileset': tile.tileset
-            }
-
-            tile_data.append(data)
-
-        self.tilemap.data['tiles'] = tile_data
-
         try:
-            if not os.path.exists(self.path):
-                raise FileNotFoundError
+            self.tilemap.journal.flush()
+        except OSError as e:
+            print(f'[Tmedit::save] {e}')
+            return
 
-            with open(os.path.join(self.path, 'tilemap.json'), 'w') as t:
-                json.dump(self.tilemap.data, t, indent=2, sort_keys=True)
+        self.autosave_time = time.time()
+        self.autosave_edits = self.tilemap.edits
 
-        except (FileNotFoundError) as e: 
-            print(e)
-        
         if alert:
             self.alert(f'Tilemap Saved: {self.tilemap.data["config"]["name"]}')
 
-    def load(self):
-        if self.tilemap:
-            self.save(False)
+    @Trace().traced()
+    def compact(self):
+        if not self.tilemap or not self.tilemap.journal.pending():
+            return
+        
+        if any(s[1] is self.tilemap for s in self.saves):
+            return
+        
+        try:
+            self.tilemap.journal.rotate()
+        except OSError as e:
+            print(f'[Tmedit::compact] {e}')
+            return
+        
+        data = copy.deepcopy(self.tilemap.data)
+        names, records = self.tilemap.get_records()
+        self.tilemap.release_source()
+
+        future = self.saver.submit(formats.write, self.tilemap.path, self.tilemap.file, data, list(names), records)
+        self.saves.append((future, self.tilemap, self.tilemap.edits))
+
+    def update_saves(self):
+        for save in [s for s in self.saves if s[0].done()]:
+            self.saves.remove(save)
+            future, tilemap, edits = save
+
+            try:
+                future.result()
+                tilemap.journal.discard()
 
-        self.path = filedialog.askdirectory()
+                if tilemap.source_chunks != None:
+                    tilemap.open(*formats.read(tilemap.path, tilemap.file)[1:], edits)
+
+            except (OSError, ValueError, struct.error) as e:
+                print(f'[Tmedit::compact] {e}')
+
+    def wait(self):
+        concurrent.futures.wait([s[0] for s in self.saves])
+        self.update_saves()
+
+    @Trace().traced()
+    def load(self, path=None):
+        path = path or filedialog.askdirectory()
+        if not path:
+            return
 
         try:
-            with open(os.path.join(self.path, 'tilemap.json')) as t:
-                data = json.load(t)
+            file = formats.detect(path)
+            data, names, records, table = formats.read(path, file)
+            config = data['config']
+
+            images = {}
+            for image in config['images']:
+                spritesheet_path = os.path.join(path, config['images'][image]['path'])
+
+                with self.core.trace_service.span('load_spritesheet', path=spritesheet_path):
+                    images[image] = load_spritesheet(spritesheet_path, scale=4)
     
-        except (json.JSONDecodeError, FileNotFoundError) as e:
+        except (json.JSONDecodeError, FileNotFoundError, ValueError, struct.error, pygame.error) as e:
             print(f'[Tmedit::load] {e}')
             return
+        
+        rect = pygame.Rect(0, 0, data['config']['tile']['dimensions'][0] * data['config']['tilemap']['dimensions'][0], 
+                           data['config']['tile']['dimensions'][1] * data['config']['tilemap']['dimensions'][1])
 
-        images = {}
-        for image in data['config']['images']:
-            spritesheet_path = os.path.join(self.path, data['config']['images'][image]['path'])
-            images[image] = load_spritesheet(spritesheet_path, scale=4)
+        bounds = pygame.Vector2(rect.width - self.viewport.width, rect.height - self.viewport.height)
 
-        surface = pygame.Surface((data['config']['tile']['dimensions'][0] * data['config']['tilemap']['dimensions'][0], 
-                                  data['config']['tile']['dimensions'][1] * data['config']['tilemap']['dimensions'][1])).convert_alpha()
+        chunk_dimensions = (data['config']['tile']['dimensions'][0] * CHUNK_SIZE, data['config']['tile']['dimensions'][1] * CHUNK_SIZE)
+        
+        chunks = {}
+        for y in range(0, rect.height, chunk_dimensions[1]):
+            for x in range(0, rect.width, chunk_dimensions[0]):
+                chunks[(x, y)] = Chunk(pygame.Rect((x, y), chunk_dimensions))
 
-        bounds = pygame.Vector2(surface.get_width() - self.viewport.width, surface.get_height() - self.viewport.height)
+        tilemap = Tilemap(data, images, rect, bounds, chunks, chunk_dimensions, path=path, file=file)
 
-        chunks = {}
+        if table != None:
+            tilemap.open(names, records, table)
+        else:
+            tilemap.add_records(names, records)
 
-        x, y = 0, 0
-        while y < surface.get_height():
-            while x < surface.get_width():
-                rect = pygame.Rect(x, y, data['config']['tile']['dimensions'][0] * 15, data['config']['tile']['dimensions'][1] * 15)
-                chunks[(x, y)] = [rect, SpriteList()]
+        journal = Journal(os.path.join(path, formats.JOURNAL_FILE))
 
-                x += rect.width
+        try:
+            with self.core.trace_service.span('Tilemap.replay'):
+                tilemap.replay(journal.read())
+        except OSError as e:
+            print(f'[Tmedit::load] {e}')
 
-            y += rect.height
-            x = 0
+        if self.tilemap:
+            self.save(False)
+            self.tilemap.journal.close()
 
-        for tile in data['tiles']:
-            image = images[tile['tileset']][tile['index']]
+        self.tilemap = tilemap
+        self.history.clear()
+        self.tools['select'].clear()
 
-            image = pygame.transform.rotate(image, -tile['orientation'])
-            image = pygame.transform.flip(image, tile['flipped'], False)
-        
-            t = Tile(image, **tile)
+        self.tilemap.journal = journal
 
-            for position in chunks:
-                if chunks[position][0].collidepoint(tile['position']):
-                    chunks[position][1].append(t)
+        self.prev_viewport.x, self.prev_viewport.y = -1, -1
 
-        self.tilemap = Tilemap(data, images, surface, bounds, chunks)
+        self.autosave = config.get('autosave', AUTOSAVE_INTERVAL)
+        self.autosave_time = time.time()
+        self.autosave_edits = self.tilemap.edits
 
         self.sidebar.load(data)
         self.navbar.load(data)
 
         pygame.display.set_caption(f'{self.core.title} - {data["config"]["name"]}')
-        self.alert(f'Tilemap Loaded: {self.tilemap.data["config"]["name"]}')
-        
-        event = pygame.event.Event(pygame.MOUSEBUTTONUP, button=1)
-        self.on_mouse_up(event)
+        self.alert(f'Tilemap Loaded: {self.tilemap.data["config"]["name"]} ({self.tilemap.file})')
+        self.cancel()
 
     def update(self):     
         self.easings.update(self.core.delta_time)
         self.sidebar.update()
         self.navbar.update()
 
+        self.update_saves()
+        if self.saves:
+            self.core.wake()
+
         if self.tilemap == None:
             return
+        
+        if self.autosave and self.tilemap.edits != self.autosave_edits:
+            if time.time() - self.autosave_time >= self.autosave:
+                self.save()
+            else:
+                self.core.wake(self.autosave - (time.time() - self.autosave_time))
+
+        if self.tilemap.journal.size > JOURNAL_LIMIT:
+            self.compact()
 
         self.global_mouse_position.x = clamp(pygame.mouse.get_pos()[0], self.sidebar.rect.width, SCREEN_DIMENSIONS[0])
         self.global_mouse_position.y = clamp(pygame.mouse.get_pos()[1], self.navbar.rect.height, SCREEN_DIMENSIONS[1])
@@ -276,10 +398,13 @@ class Tmedit:
         self.fill.x, self.fill.y = -self.viewport.x, -self.viewport.y
 
         if self.viewport.x != self.prev_viewport.x or self.viewport.y != self.prev_viewport.y:
-            self.renderable_chunks = []
-            for position in self.tilemap.chunks:
-                if self.tilemap.chunks[position][0].colliderect(self.fill):
-                    self.renderable_chunks.append(position)
+            self.tilemap.stream(self.fill)
+
+            renderable_chunks = self.tilemap.get_chunk_keys(self.fill)
+            for position in set(self.renderable_chunks) - set(renderable_chunks):
+                self.tilemap.chunks[position].clear()
+
+            self.renderable_chunks = renderable_chunks
 
             self.prev_viewport.x = self.viewport.x
             self.prev_viewport.y = self.viewport.y
@@ -303,32 +428,84 @@ class Tmedit:
         if len(self.alerts) == 0:
             self.alert_y = 0
 
-    def render_grid(self):
-        config = self.tilemap.data['config']
-        color = (4, 4, 4)
+        self.hud.update()
+
+    def blit(self, image, position):
+        self.surface.blit(image, (position[0] + self.viewport.x, position[1] + self.viewport.y))
+
+    def get_grid(self):
+        dimensions = tuple(self.tilemap.data['config']['tile']['dimensions'])
+        if self.grid and self.grid[0] == dimensions:
+            return self.grid[1]
         
-        step_x = config['tile']['dimensions'][0]
-        max_x = self.tilemap.surface.get_width()
+        color = (4, 4, 4)
+
+        surface = pygame.Surface((self.viewport.width + dimensions[0], self.viewport.height + dimensions[1])).convert()
+        surface.fill((0, 0, 0))
+
+        for x in range(0, surface.get_width(), dimensions[0]):
+            pygame.gfxdraw.vline(surface, x, 0, surface.get_height(), color)
+
+        for y in range(0, surface.get_height(), dimensions[1]):
+            pygame.gfxdraw.hline(surface, 0, surface.get_width(), y, color)
+
+        self.grid = (dimensions, surface)
+        return surface
 
-        step_y = config['tile']['dimensions'][1]
-        max_y = self.tilemap.surface.get_height()
+    def render_grid(self):
+        grid = self.get_grid()
+        dimensions = self.grid[0]
 
-        x = step_x
-        while x <= max_x:
-            pygame.gfxdraw.line(self.tilemap.surface, x, 0, x, max_y, color)
-            x += step_x
+        rect = self.tilemap.rect.move(self.viewport.topleft)
 
-        y = step_y
-        while y <= max_y:
-            pygame.gfxdraw.line(self.tilemap.surface, 0, y, max_x, y, color)
-            y += step_y
+        self.surface.set_clip((rect.left + 1, rect.top + 1, rect.width, rect.height))
+        self.surface.blit(grid, (-(-self.viewport.x % dimensions[0]), -(-self.viewport.y % dimensions[1])))
+        self.surface.set_clip(None)
 
     def render_tilemap(self):
         strata = self.settings['strata'] if self.modes['strata filtering'] else None
-        for position in self.renderable_chunks:
-            self.tilemap.chunks[position][1].render_all(self.tilemap.surface, strata)
 
-        self.tool[1].render_pre()
+        with self.core.timings.time('render_tilemap'):
+            for position in self.renderable_chunks:
+                with self.core.trace_service.span('render_chunk', key=position):
+                    self.tilemap.render_chunk(position, self.surface, strata, self.viewport.topleft)
+
+        with self.core.timings.time('render_tool'):
+            self.tool[1].render_pre()
+        
+    def get_view(self):
+        width, height = self.tilemap.data['config']['tile']['dimensions']
+        x, y = self.mouse_position
+
+        position = None
+        if self.mouse_focus and self.modes['snapping']:
+            position = (x // width, y // height, round(x / width), round(y / height))
+        elif self.mouse_focus:
+            position = (round(x), round(y))
+
+        return (self.tilemap, self.tilemap.edits, tuple(self.viewport.topleft), self.tool[0], position, self.mouse_down, len(self.alerts))
+
+    def render_view(self):
+        view = self.get_view()
+        rect = pygame.Rect((self.sidebar.rect.width, self.navbar.rect.height), self.viewport.size)
+
+        inputs = (pygame.KEYDOWN, pygame.KEYUP, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP)
+        if view != self.view or len(self.alerts) or any(e.type in inputs for e in self.core.events):
+            self.core.mark_dirty(rect)
+        else:
+            for hud_rect in self.hud.rects:
+                self.core.mark_dirty(hud_rect)
+
+        self.view = view
+
+    def render_cursor(self):
+        cursor = self.tool[1].render_post()
+
+        for rect in (self.cursor, cursor):
+            if rect:
+                self.core.mark_dirty(rect)
+
+        self.cursor = cursor
         
     def render(self):
         self.core.screen.fill(SCREEN_COLOR)
@@ -337,35 +514,22 @@ class Tmedit:
         self.navbar.render()
 
         if self.tilemap == None:
-            self.tool[1].render_post()
+            self.render_cursor()
             return
 
-        self.tilemap.surface.fill((0, 0, 0), self.fill)
+        self.surface.fill((0, 0, 0))
 
-        self.render_grid()
-        self.render_tilemap()
+        with self.core.timings.time('render_grid'):
+            self.render_grid()
 
-        surface = pygame.Surface((self.viewport.width, self.viewport.height))
-        surface.blit(self.tilemap.surface, self.viewport)
+        self.render_tilemap()
 
-        self.core.screen.blit(surface, (self.sidebar.rect.width, self.navbar.rect.height))
+        self.core.screen.blit(self.surface, (self.sidebar.rect.width, self.navbar.rect.height))
         
-        y = 4
-        for setting in self.settings:
-            text = self.core.font_service.create('m3x6', f'{setting}: {self.settings[setting]}')    
-            self.core.screen.blit(text, text.get_rect(topleft=(self.sidebar.rect.right + 6, self.navbar.rect.bottom + y)))
-
-            y += text.get_height() + 4
-
-        y = 4
-        for mode in [s for s in self.modes.keys() if self.modes[s]]:
-            text = self.core.font_service.create('m3x6', mode)
-            self.core.screen.blit(text, text.get_rect(bottomleft=(self.sidebar.rect.right + 6, SCREEN_DIMENSIONS[1] - y)))
-
-            y += text.get_height() + 4
-
-        text = self.core.font_service.create('m3x6', f'{round(self.mouse_position.x), round(self.mouse_position.y)}')
-        self.core.screen.blit(text, text.get_rect(bottomright=(SCREEN_DIMENSIONS[0] - 6, SCREEN_DIMENSIONS[1] - 4)))
+        with self.core.timings.time('render_hud'):
+            self.hud.render(self.core.screen)
 
         self.alerts.render_all()
-        self.tool[1].render_post()
+
+        self.render_view()
+        self.render_cursor()
@@ -2,12 +2,111 @@ from pge.core import Core
 from pge.utils import generate_import_dict, scale
 
 from scripts import IMAGE_PATH
-from scripts import Tile
+from scripts import Journal
 
 import pygame
 import pygame.gfxdraw
+import numpy
 import os
 
+def interpolate(start, end, step):
+    dx, dy = round((end[0] - start[0]) / step[0]), round((end[1] - start[1]) / step[1])
+    sx, sy = (1 if dx > 0 else -1), (1 if dy > 0 else -1)
+
+    dx, dy = abs(dx), -abs(dy)
+    error = dx + dy
+
+    x, y = 0, 0
+    positions = [start]
+
+    while x != dx * sx or y != -dy * sy:
+        e2 = 2 * error
+
+        if e2 >= dy:
+            error += dy
+            x += sx
+
+        if e2 <= dx:
+            error += dx
+            y += sy
+
+        positions.append((start[0] + x * step[0], start[1] + y * step[1]))
+
+    positions[-1] = end
+    return positions
+
+def flood(grid, cell):
+    height, width = grid.shape
+    empty = ~grid
+
+    if not (0 <= cell[0] < width and 0 <= cell[1] < height) or not empty[cell[1], cell[0]]:
+        return numpy.zeros(0, numpy.int64), numpy.zeros(0, numpy.int64)
+
+    remaining = empty.copy()
+    seeds = [cell]
+
+    while seeds:
+        x, y = seeds.pop()
+
+        row = remaining[y]
+        if not row[x]:
+            continue
+
+        blocked = numpy.flatnonzero(~row[:x])
+        left = blocked[-1] + 1 if len(blocked) else 0
+
+        blocked = numpy.flatnonzero(~row[x:])
+        right = x + blocked[0] if len(blocked) else width
+
+        row[left:right] = False
+
+        for ny in (y - 1, y + 1):
+            if not 0 <= ny < height:
+                continue
+
+            segment = remaining[ny, left:right]
+            starts = numpy.flatnonzero(segment[1:] & ~segment[:-1]) + 1
+
+            if len(segment) and segment[0]:
+                seeds.append((left, ny))
+
+            seeds.extend((left + s, ny) for s in starts.tolist())
+
+    y, x = numpy.nonzero(empty & ~remaining)
+    return x, y
+
+def get_columns(tmedit, x, y):
+    selected = tmedit.sidebar.selected
+    store = tmedit.tilemap.store
+    length = len(x)
+
+    return {
+        'x': x,
+        'y': y,
+        'strata': numpy.full(length, tmedit.settings['strata']),
+        'tileset': numpy.full(length, store.intern(selected['tileset'])),
+        'index': numpy.full(length, selected['index']),
+        'orientation': numpy.full(length, tmedit.settings['orientation']),
+        'flipped': numpy.full(length, tmedit.settings['flipped']),
+        'tile': numpy.full(length, store.intern(selected['tile']))
+    }
+
+def fill_cells(tmedit, name, x, y):
+    if not len(x):
+        return
+    
+    tilemap = tmedit.tilemap
+    width, height = tilemap.data['config']['tile']['dimensions']
+    x, y = x * width, y * height
+
+    for key in tilemap.get_position_keys(x, y):
+        tilemap.load_chunk(key)
+
+    rows = tilemap.add_tiles(get_columns(tmedit, x, y))
+    if len(rows):
+        tmedit.history.record(name, Journal.ADD, tilemap.store.snapshot(rows))
+        tmedit.history.commit()
+
 class Tool:
     def __init__(self, tmedit, keybind):
         assert Core.instanced
@@ -23,9 +122,9 @@ class Tool:
     def on_mouse_up(self, event):
         ...
 
-    def undo(self, action):
-        ...
-        
+    def cancel(self):
+        self.on_mouse_up(pygame.event.Event(pygame.MOUSEBUTTONUP, button=1))
+
     def update(self):
         ...
     
@@ -34,9 +133,9 @@ class Tool:
 
     def render_post(self):
         if not pygame.mouse.get_focused():
-            return False
+            return None
 
-        self.core.screen.blit(self.image, self.image.get_rect(center=pygame.mouse.get_pos()))
+        return self.core.screen.blit(self.image, self.image.get_rect(center=pygame.mouse.get_pos()))
 
 class Move(Tool):
     def __init__(self, tmedit):
@@ -92,46 +191,50 @@ class Brush(Tool):
     def __init__(self, tmedit):
         super().__init__(tmedit, pygame.K_b)
 
+        self.previous = None
+
     def on_mouse_down(self, event):
         if event.button != 1 or not self.tmedit.mouse_focus:
             return
         
-        selected = self.tmedit.sidebar.selected
         dimensions = self.tmedit.tilemap.data['config']['tile']['dimensions']
 
-        chunks = [c for c in self.tmedit.renderable_chunks if self.tmedit.tilemap.chunks[c][0].collidepoint(self.tmedit.mouse_position)]
-        if not chunks:
-            return
-        
         if self.tmedit.modes['snapping']:
             position = ((dimensions[0] * round(self.tmedit.mouse_position.x / dimensions[0])), (dimensions[1] * round(self.tmedit.mouse_position.y / dimensions[1])))
-            for tile in self.tmedit.tilemap.chunks[chunks[0]][1]:
-                if tile.position == position and tile.strata == self.tmedit.settings['strata']:
-                    return
+        else:
+            position = (round(self.tmedit.mouse_position.x), round(self.tmedit.mouse_position.y))
 
+        if self.previous == None:
+            positions = [position]
         else:
-            position = self.tmedit.mouse_position
+            positions = interpolate(self.previous, position, dimensions)[1:]
 
-        image = self.tmedit.tilemap.images[selected['tileset']][selected['index']]
-        image = pygame.transform.rotate(image, -self.tmedit.settings['orientation'])
-        image = pygame.transform.flip(image, self.tmedit.settings['flipped'], False)  
+        if positions:
+            self.previous = position
 
-        tile = Tile(image, image.get_size(), self.tmedit.settings['flipped'], selected['index'], self.tmedit.settings['orientation'], 
-                    position, self.tmedit.settings['strata'], selected['tile'], selected['tileset'])
+        if self.tmedit.modes['snapping']:
+            strata = self.tmedit.settings['strata']
+            positions = [p for p in positions if self.tmedit.tilemap.get_cell_row(self.tmedit.tilemap.get_cell(p), strata) == None]
 
-        self.tmedit.tilemap.chunks[chunks[0]][1].append(tile)
-        self.tmedit.actions.append(('brush', (chunks[0], tile)))
+        if not positions:
+            return
+        
+        rows = self.tmedit.tilemap.add_tiles(get_columns(self.tmedit, [p[0] for p in positions], [p[1] for p in positions]))
+        if len(rows):
+            self.tmedit.history.record('brush', Journal.ADD, self.tmedit.tilemap.store.snapshot(rows))
 
-    def undo(self, action):
-        self.tmedit.tilemap.chunks[action[1][0]][1].remove(action[1][1])
+    def on_mouse_up(self, event):
+        if event.button != 1:
+            return
+        
+        self.previous = None
         
     def render_pre(self):
         if not self.tmedit.mouse_focus:
             return
         
-        image = self.tmedit.tilemap.images[self.tmedit.sidebar.selected['tileset']][self.tmedit.sidebar.selected['index']]
-        image = pygame.transform.rotate(image, -self.tmedit.settings['orientation'])
-        image = pygame.transform.flip(image, self.tmedit.settings['flipped'], False)
+        selected = self.tmedit.sidebar.selected
+        image = self.tmedit.tilemap.get_image(selected['tileset'], selected['index'], self.tmedit.settings['orientation'], self.tmedit.settings['flipped'])
 
         dimensions = self.tmedit.tilemap.data['config']['tile']['dimensions']
 
@@ -140,10 +243,8 @@ class Brush(Tool):
         else:
             position = self.tmedit.mouse_position
 
-        self.tmedit.tilemap.surface.blit(image, position)
-
-        image = pygame.mask.from_surface(image).to_surface(setcolor=(255, 255, 255, 55), unsetcolor=(0, 0, 0, 0))
-        self.tmedit.tilemap.surface.blit(image, position)
+        self.tmedit.blit(image, position)
+        self.tmedit.blit(self.tmedit.tilemap.get_overlay(selected['tileset'], selected['index'], self.tmedit.settings['orientation'], self.tmedit.settings['flipped']), position)
 
 class Erase(Tool):
     def __init__(self, tmedit):
@@ -153,34 +254,279 @@ class Erase(Tool):
         if event.button != 1 or not self.tmedit.mouse_focus:
             return
         
-        selected = self.get_selected()
-        if not selected:
+        row = self.tmedit.tilemap.get_row(self.tmedit.mouse_position, self.tmedit.settings['strata'])
+        if row == None:
+            return
+        
+        self.tmedit.history.record('erase', Journal.REMOVE, self.tmedit.tilemap.store.snapshot([row]))
+        self.tmedit.tilemap.remove_rows(numpy.array([row]))
+
+    def render_pre(self):
+        if not self.tmedit.mouse_focus:
+            return
+        
+        row = self.tmedit.tilemap.get_row(self.tmedit.mouse_position, self.tmedit.settings['strata'])
+        if row == None:
+            return
+        
+        data = self.tmedit.tilemap.store.get(row)
+        image = self.tmedit.tilemap.get_overlay(data['tileset'], data['index'], data['orientation'], data['flipped'], (255, 0, 0, 55))
+
+        self.tmedit.blit(image, (data['x'], data['y']))
+
+class Fill(Tool):
+    def __init__(self, tmedit):
+        super().__init__(tmedit, pygame.K_f)
+
+        self.anchor = None
+
+    def on_mouse_down(self, event):
+        if event.button != 1 or self.tmedit.mouse_down:
+            return
+        
+        self.tmedit.mouse_down = True
+        self.anchor = self.tmedit.tilemap.get_cell(self.tmedit.mouse_position)
+
+    def on_mouse_up(self, event):
+        if event.button != 1 or not self.tmedit.mouse_down:
+            return
+        
+        self.tmedit.mouse_down = False
+        left, top, right, bottom = self.get_cells()
+
+        grid = self.tmedit.tilemap.get_occupancy(self.tmedit.settings['strata'])
+        y, x = numpy.nonzero(~grid[top:bottom, left:right])
+
+        fill_cells(self.tmedit, 'fill', x + left, y + top)
+        self.anchor = None
+
+    def cancel(self):
+        self.tmedit.mouse_down = False
+        self.anchor = None
+
+    def get_cells(self):
+        cell = self.tmedit.tilemap.get_cell(self.tmedit.mouse_position)
+        anchor = self.anchor or cell
+
+        return (min(anchor[0], cell[0]), min(anchor[1], cell[1]), max(anchor[0], cell[0]) + 1, max(anchor[1], cell[1]) + 1)
+
+    def render_pre(self):
+        if not self.tmedit.mouse_focus and not self.tmedit.mouse_down:
+            return
+        
+        width, height = self.tmedit.tilemap.data['config']['tile']['dimensions']
+        left, top, right, bottom = self.get_cells()
+
+        rect = pygame.Rect(left * width, top * height, (right - left) * width, (bottom - top) * height)
+        pygame.gfxdraw.box(self.tmedit.surface, rect.move(self.tmedit.viewport.topleft), (255, 255, 255, 55))
+
+class Flood(Tool):
+    def __init__(self, tmedit):
+        super().__init__(tmedit, pygame.K_g)
+
+    def on_mouse_down(self, event):
+        if event.button != 1 or self.tmedit.mouse_down:
             return
         
-        self.tmedit.tilemap.chunks[selected[0]][1].remove(selected[1])
-        self.tmedit.actions.append(('erase', selected))
+        self.tmedit.mouse_down = True
 
-    def get_selected(self):
-        chunks = [c for c in self.tmedit.renderable_chunks if self.tmedit.tilemap.chunks[c][0].collidepoint(self.tmedit.mouse_position)]
+        grid = self.tmedit.tilemap.get_occupancy(self.tmedit.settings['strata'])
+        x, y = flood(grid, self.tmedit.tilemap.get_cell(self.tmedit.mouse_position))
 
-        for chunk in chunks:
-            tiles = self.tmedit.tilemap.chunks[chunk][1]
-            for tile in tiles:
-                if tile.rect.collidepoint(self.tmedit.mouse_position) and tile.strata == self.tmedit.settings['strata']:
-                    return (chunk, tile)
-                
-    def undo(self, action):
-        self.tmedit.tilemap.chunks[action[1][0]][1].append(action[1][1])
+        fill_cells(self.tmedit, 'flood', x, y)
+
+    def on_mouse_up(self, event):
+        if event.button != 1:
+            return
+        
+        self.tmedit.mouse_down = False
 
     def render_pre(self):
         if not self.tmedit.mouse_focus:
             return
         
-        selected = self.get_selected()
-        if not selected:
+        width, height = self.tmedit.tilemap.data['config']['tile']['dimensions']
+        cell = self.tmedit.tilemap.get_cell(self.tmedit.mouse_position)
+
+        rect = pygame.Rect(cell[0] * width, cell[1] * height, width, height)
+        pygame.gfxdraw.box(self.tmedit.surface, rect.move(self.tmedit.viewport.topleft), (255, 255, 255, 55))
+
+class Select(Tool):
+    def __init__(self, tmedit):
+        super().__init__(tmedit, pygame.K_s)
+
+        self.selection = None
+        self.strata = None
+
+        self.anchor = None
+        self.dragging = False
+
+        self.clipboard = None
+
+    def clear(self):
+        self.selection = None
+        self.anchor = None
+        self.dragging = False
+
+        self.clipboard = None
+
+    def on_mouse_down(self, event):
+        if event.button != 1 or self.tmedit.mouse_down:
+            return
+        
+        self.tmedit.mouse_down = True
+        self.anchor = self.tmedit.tilemap.get_cell(self.tmedit.mouse_position)
+
+        self.dragging = bool(self.selection and self.selection.collidepoint(self.anchor))
+        if self.dragging:
+            return
+
+        self.selection = None
+        self.strata = self.tmedit.settings['strata'] if self.tmedit.modes['strata filtering'] else None
+
+    def on_mouse_up(self, event):
+        if event.button != 1 or not self.tmedit.mouse_down:
             return
         
-        image = pygame.mask.from_surface(selected[1].image).to_surface(setcolor=(255, 0, 0, 55), unsetcolor=(0, 0, 0, 0))
-        self.tmedit.tilemap.surface.blit(image, selected[1].position)
+        self.tmedit.mouse_down = False
+
+        if self.dragging:
+            offset = self.get_offset()
+            if offset != (0, 0):
+                self.move(offset)
+
+        else:
+            self.selection = self.get_selection()
+
+        self.anchor = None
+        self.dragging = False
+
+    def cancel(self):
+        if self.tmedit.mouse_down and not self.dragging:
+            self.selection = None
+
+        self.tmedit.mouse_down = False
+
+        self.anchor = None
+        self.dragging = False
+
+    def get_selection(self):
+        cell = self.tmedit.tilemap.get_cell(self.tmedit.mouse_position)
+        anchor = self.anchor or cell
+
+        return pygame.Rect(min(anchor[0], cell[0]), min(anchor[1], cell[1]), abs(anchor[0] - cell[0]) + 1, abs(anchor[1] - cell[1]) + 1)
+
+    def get_offset(self):
+        cell = self.tmedit.tilemap.get_cell(self.tmedit.mouse_position)
+        return (cell[0] - self.anchor[0], cell[1] - self.anchor[1])
+    
+    def get_rect(self, selection):
+        width, height = self.tmedit.tilemap.data['config']['tile']['dimensions']
+        return pygame.Rect(selection.x * width, selection.y * height, selection.width * width, selection.height * height)
+    
+    def get_rows(self):
+        return self.tmedit.tilemap.get_rows(self.get_rect(self.selection), self.strata)
+
+    def place(self, name, columns, rows=None):
+        tilemap = self.tmedit.tilemap
+
+        if rows is not None and len(rows):
+            self.tmedit.history.record(name, Journal.REMOVE, tilemap.store.snapshot(rows))
+            tilemap.remove_rows(rows)
+
+        x, y = columns['x'], columns['y']
+        if len(x):
+            tilemap.load_rect(pygame.Rect(x.min(), y.min(), x.max() - x.min() + 1, y.max() - y.min() + 1))
+
+        covered = tilemap.get_covered(columns)
+        if len(covered):
+            self.tmedit.history.record(name, Journal.REMOVE, tilemap.store.snapshot(covered))
+            tilemap.remove_rows(covered)
+
+        added = tilemap.add_tiles(columns)
+        if len(added):
+            self.tmedit.history.record(name, Journal.ADD, tilemap.store.snapshot(added))
+
+        self.tmedit.history.commit()
+
+    def move(self, offset):
+        width, height = self.tmedit.tilemap.data['config']['tile']['dimensions']
+
+        rows = self.get_rows()
+        columns = self.tmedit.tilemap.store.snapshot(rows)
+
+        columns['x'] = columns['x'] + offset[0] * width
+        columns['y'] = columns['y'] + offset[1] * height
+
+        self.place('move', columns, rows)
+        self.selection = self.selection.move(offset)
+
+    def copy(self, alert=True):
+        if not self.selection:
+            return
+        
+        rect = self.get_rect(self.selection)
+        columns = self.tmedit.tilemap.store.snapshot(self.get_rows())
+
+        columns['x'] -= rect.x
+        columns['y'] -= rect.y
+
+        self.clipboard = (list(self.tmedit.tilemap.store.names), columns, self.selection.size)
+
+        if alert:
+            self.tmedit.alert(f'Copied: {len(columns["x"])} tiles')
+
+    def cut(self):
+        if not self.selection:
+            return
+        
+        self.copy(False)
+
+        rows = self.get_rows()
+        if not len(rows):
+            return
+        
+        self.tmedit.history.record('cut', Journal.REMOVE, self.tmedit.tilemap.store.snapshot(rows))
+        self.tmedit.history.commit()
+
+        self.tmedit.tilemap.remove_rows(rows)
+
+    def paste(self):
+        if not self.clipboard:
+            return
+        
+        names, columns, size = self.clipboard
+        columns = dict(columns)
+
+        store = self.tmedit.tilemap.store
+        ids = store.intern_many(names)
+
+        for name in store.NAMES:
+            columns[name] = ids[columns[name]]
+
+        cell = self.tmedit.tilemap.get_cell(self.tmedit.mouse_position)
+        rect = self.get_rect(pygame.Rect(cell, size))
+
+        columns['x'] = columns['x'] + rect.x
+        columns['y'] = columns['y'] + rect.y
+
+        self.place('paste', columns)
+        self.selection = pygame.Rect(cell, size)
+
+    def render_pre(self):
+        if self.tmedit.mouse_down and self.dragging:
+            selection = self.selection.move(self.get_offset())
+        elif self.tmedit.mouse_down:
+            selection = self.get_selection()
+        else:
+            selection = self.selection
+
+        if not selection:
+            return
+        
+        rect = self.get_rect(selection).move(self.tmedit.viewport.topleft)
+
+        pygame.gfxdraw.box(self.tmedit.surface, rect, (255, 255, 255, 35))
+        pygame.gfxdraw.rectangle(self.tmedit.surface, rect, (255, 255, 255, 155))
 
-TOOLS = generate_import_dict('Tool', 'Tile')
+TOOLS = generate_import_dict('Tool', 'Journal')